@@ -1,17 +1,22 @@
 import streamlit as st
 
+from workshop import assets
+
+# Served from this app as content-hashed static files (GitHub raw URLs only if the files are missing).
+IMAGE_BASE = "https://raw.githubusercontent.com/MK316/gnu260112/main/images"
+
 st.markdown("### 🐾 Bringing Streamlit into the Classroom")
 st.caption("2026. 01. 12. Workshop")
 
 
 st.image(
-    "https://raw.githubusercontent.com/MK316/gnu260112/main/images/bg01.png",
+    assets.image_url("images/bg01.png", f"{IMAGE_BASE}/bg01.png"),
     width=400,
     caption="Teaching is one of the best ways to learn."
 )
 
 st.image(
-    "https://raw.githubusercontent.com/MK316/gnu260112/main/images/gnu26112.png",
+    assets.image_url("images/gnu26112.png", f"{IMAGE_BASE}/gnu26112.png"),
     width=100,
     caption="Access QR"
 )
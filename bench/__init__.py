@@ -0,0 +1 @@
+"""Benchmarks and load tests for the workshop app (run from the repo root: python -m bench.<name>)."""
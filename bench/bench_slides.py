@@ -0,0 +1,183 @@
+# ------------------------------------------------------------
+# Benchmark for the Lecture Slides page
+#
+#   python -m bench.bench_slides                          # print results
+#   python -m bench.bench_slides --latency 0.08 --save bench/baselines/wifi.json
+#   python -m bench.bench_slides --compare bench/baselines/wifi.json
+#
+# Serves slides/ from a local HTTP stand-in (bench.standin) with injected
+# latency, runs the page headlessly with Streamlit's AppTest and reports:
+#   discovery_cold_s        discover() against the stand-in, nothing cached
+#   first_render_cold_s     first page run after all caches were cleared
+#   first_render_warm_s     first run of a new session, caches warm
+#   thumb_page_cold_s       rerun that opens thumbnail page 2 for the first time (grid already open)
+#   thumb_page_warm_s       the same in a new session
+#   nav_rerun_*_s           reruns for "Go to Slide #" navigation (p50 / p95 / mean)
+# --compare exits with status 1 if a metric is slower than the baseline
+# by more than --tolerance (relative) and 5 ms (absolute).
+# ------------------------------------------------------------
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+import streamlit as st
+import streamlit.logger
+from streamlit.testing.v1 import AppTest
+
+from bench.standin import SlideServer
+from workshop import config
+from workshop.sources import HttpSource, discover
+
+APP_DIR   = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAGE      = os.path.join(APP_DIR, "pages", "1🌱_Lecture_Slides.py")
+SLIDES    = os.path.join(APP_DIR, "slides")
+ABS_SLACK = 0.005
+DECK      = (config.FILENAME_PREFIX, config.FILENAME_EXT, config.START_INDEX, config.END_INDEX,
+             config.SUFFIX_TRY_ORDER)
+
+
+def _timed(fn):
+    t0 = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - t0, result
+
+
+def _run(at: AppTest) -> AppTest:
+    at.run()
+    if at.exception:
+        raise RuntimeError(f"page raised: {at.exception[0].value}")
+    return at
+
+
+def _set(at: AppTest, key: str, value) -> AppTest:
+    at.number_input(key=key).set_value(value)
+    return _run(at)
+
+
+def _open_thumbs(at: AppTest) -> AppTest:
+    at.toggle(key="show_thumbs").set_value(True)
+    return _run(at)
+
+
+def _new_session() -> AppTest:
+    return AppTest.from_file(PAGE, default_timeout=300)
+
+
+def _clear_caches(cache_dir: str) -> None:
+    st.cache_data.clear()
+    st.cache_resource.clear()
+    shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+def percentile(values: list[float], q: float) -> float:
+    s = sorted(values)
+    if not s:
+        return 0.0
+    k = (len(s) - 1) * q
+    lo, hi = int(k), min(int(k) + 1, len(s) - 1)
+    return s[lo] + (s[hi] - s[lo]) * (k - lo)
+
+
+def run(latency: float, nav: int, source: str, manifest: bool) -> dict:
+    cache_dir = tempfile.mkdtemp(prefix="slides-bench-")
+    metrics = {}
+    with SlideServer(SLIDES, latency=latency) as srv:
+        os.environ.update({
+            "SLIDES_SOURCE": source,
+            "SLIDES_RAW_BASE": srv.url,
+            "SLIDES_DISCOVERY": "probe",        # the stand-in has no GitHub contents API
+            "SLIDES_USE_MANIFEST": "1" if manifest else "0",
+            "SLIDES_CACHE_DIR": cache_dir,
+            "SLIDES_WARM_UP": "0",              # the *_cold numbers measure the path without warm-up
+        })
+
+        metrics["discovery_cold_s"], _ = _timed(lambda: discover(HttpSource(srv.url), *DECK))
+
+        _clear_caches(cache_dir)
+        metrics["first_render_cold_s"], at = _timed(lambda: _run(_new_session()))
+        metrics["first_render_warm_s"], _ = _timed(lambda: _run(_new_session()))
+
+        _open_thumbs(at)
+        metrics["thumb_page_cold_s"], _ = _timed(lambda: _set(at, "thumb_page", 2))
+        warm = _open_thumbs(_run(_new_session()))
+        metrics["thumb_page_warm_s"], _ = _timed(lambda: _set(warm, "thumb_page", 2))
+
+        total = int(at.number_input(key="slide_input").max)
+        laps = []
+        for k in range(nav):
+            target = (k + 1) % total + 1
+            dt, _ = _timed(lambda: _set(at, "slide_input", target))
+            laps.append(dt)
+        metrics["nav_rerun_p50_s"] = percentile(laps, 0.50)
+        metrics["nav_rerun_p95_s"] = percentile(laps, 0.95)
+        metrics["nav_rerun_mean_s"] = statistics.fmean(laps) if laps else 0.0
+        metrics["standin_requests"] = dict(srv.requests)
+
+    shutil.rmtree(cache_dir, ignore_errors=True)
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "streamlit": st.__version__,
+            "latency_s": latency,
+            "source": source,
+            "manifest": manifest,
+            "nav_steps": nav,
+        },
+        "metrics": metrics,
+    }
+
+
+def compare(result: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Names of timing metrics that regressed against the baseline."""
+    bad = []
+    for key, base in baseline["metrics"].items():
+        if not key.endswith("_s") or key not in result["metrics"]:
+            continue
+        now = result["metrics"][key]
+        if now > base * (1 + tolerance) + ABS_SLACK:
+            bad.append(f"{key}: {now * 1000:.1f} ms vs baseline {base * 1000:.1f} ms")
+    return bad
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Benchmark the Lecture Slides page against a local HTTP stand-in.")
+    ap.add_argument("--latency", type=float, default=0.05, help="seconds added to every stand-in request")
+    ap.add_argument("--nav", type=int, default=20, help="navigation reruns to time")
+    ap.add_argument("--source", choices=["http", "local"], default="http")
+    ap.add_argument("--manifest", action="store_true", help="let the page use build_slides.py output")
+    ap.add_argument("--save", help="write results (JSON) to this file")
+    ap.add_argument("--compare", help="baseline JSON to check against")
+    ap.add_argument("--tolerance", type=float, default=0.25, help="allowed relative slowdown for --compare")
+    args = ap.parse_args(argv)
+
+    streamlit.logger.set_log_level("error")  # AppTest runs without a server: silence bare-mode warnings
+    result = run(args.latency, args.nav, args.source, args.manifest)
+    for key, value in result["metrics"].items():
+        print(f"{key:24s} {value * 1000:9.1f} ms" if key.endswith("_s") else f"{key:24s} {value}")
+
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, "w") as f:
+            json.dump(result, f, indent=1)
+        print(f"saved {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(result, json.load(f), args.tolerance)
+        for line in regressions:
+            print("REGRESSION", line)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
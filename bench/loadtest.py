@@ -0,0 +1,384 @@
+# ------------------------------------------------------------
+# Classroom-scale load test
+#
+#   python -m bench.loadtest                              # 30 sessions
+#   python -m bench.loadtest --sessions 60 --save bench/baselines/class60.json
+#   python -m bench.loadtest --sessions 60 --compare bench/baselines/class60.json
+#
+# Starts the app (serve.py, as deployed) on a free local port with slides served
+# from the HTTP stand-in (bench.standin), then runs N concurrent sessions over
+# Streamlit's websocket protocol, like N browser tabs. Each session:
+#   open_home     HOME
+#   open_slides   the Lecture Slides page
+#   navigate      "Go to Slide #" (--nav times)
+#   open_thumbs   the "📑 Thumbnails" toggle
+#   thumb_page    thumbnail page 2
+#   thumb_click   a thumbnail button
+# with --think seconds (jittered) between actions; session starts are spread over --ramp.
+# A rerun's latency runs from sending the widget change to its final script_finished.
+# Images are not downloaded (the rerun cost only). Reports:
+#   rerun_p50/p95/p99_s     all reruns;  <action>_p50/p95_s per action
+#   reruns_per_sec          completed reruns / wall time of the session phase
+#   rss_baseline_mb         server (and its child processes) after one warm-up session
+#   rss_loaded_mb           the same with every session open and idle
+#   rss_peak_mb             highest sample during the run (every 0.2 s)
+#   mem_per_session_mb      (loaded - baseline) / sessions
+# --compare exits with status 1 if a latency or memory metric regressed by more
+# than --tolerance (relative).
+# ------------------------------------------------------------
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+
+import streamlit as st
+import websockets
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+from bench.bench_slides import APP_DIR, SLIDES, compare, percentile
+from bench.standin import SlideServer
+
+ACTIONS = ["open_home", "open_slides", "navigate", "open_thumbs", "thumb_page", "thumb_click"]
+ACTION_TIMEOUT = 120   # seconds before a rerun counts as failed
+MB = 1024 * 1024
+
+EARLY_FOR_RERUN = ForwardMsg.ScriptFinishedStatus.Value("FINISHED_EARLY_FOR_RERUN")
+
+
+# ---- server ----
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_healthy(url: str, proc: subprocess.Popen, timeout: float = 60) -> None:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"server exited with status {proc.returncode}")
+        try:
+            with urllib.request.urlopen(f"{url}/_stcore/health", timeout=1) as r:
+                if r.status == 200:
+                    return
+        except OSError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"server not healthy after {timeout:.0f}s")
+
+
+def _tail(f, lines: int = 20) -> str:
+    f.seek(0)
+    return "".join(f.read().decode("utf-8", "replace").splitlines(keepends=True)[-lines:])
+
+
+def _tree_rss(pid: int) -> int:
+    """Resident memory (bytes) of `pid` and its descendants, from /proc."""
+    children = {}
+    for entry in os.listdir("/proc"):
+        if entry.isdigit():
+            try:
+                with open(f"/proc/{entry}/stat") as f:
+                    ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+            except (OSError, IndexError, ValueError):
+                continue
+            children.setdefault(ppid, []).append(int(entry))
+    total, todo = 0, [pid]
+    while todo:
+        p = todo.pop()
+        todo.extend(children.get(p, []))
+        try:
+            with open(f"/proc/{p}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        total += int(line.split()[1]) * 1024
+                        break
+        except OSError:
+            pass
+    return total
+
+
+class _RssSampler:
+    def __init__(self, pid: int, every: float = 0.2):
+        self.pid, self.every, self.peak = pid, every, 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+
+    def _loop(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, _tree_rss(self.pid))
+            self._stop.wait(self.every)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+# ---- one simulated browser tab ----
+
+class Session:
+    def __init__(self, ws):
+        self.ws = ws
+        self.pages = {}      # url_pathname -> page_script_hash
+        self.page = ""
+        self.widgets = {}    # user key -> (widget id, fragment id)
+        self.maxima = {}     # user key -> max of a number_input
+        self.values = {}     # widget id -> WidgetState the "browser" currently holds
+        self.laps = []       # (action, seconds)
+        self.errors = []
+
+    async def _rerun(self, action: str, page: str = None, change: WidgetState = None, fragment_id: str = ""):
+        msg = BackMsg()
+        cs = msg.rerun_script
+        if page is not None and page != self.page:
+            self.page, self.widgets, self.maxima, self.values = page, {}, {}, {}
+        cs.page_script_hash = self.page
+        states = dict(self.values)
+        if change is not None:
+            states[change.id] = change
+            if not change.HasField("trigger_value"):
+                self.values[change.id] = change
+        cs.widget_states.widgets.extend(states.values())
+        cs.fragment_id = fragment_id
+
+        t0 = time.perf_counter()
+        await self.ws.send(msg.SerializeToString())
+        while True:
+            fwd = ForwardMsg()
+            fwd.ParseFromString(await asyncio.wait_for(self.ws.recv(), ACTION_TIMEOUT))
+            kind = fwd.WhichOneof("type")
+            if kind == "navigation":
+                self.pages = {p.url_pathname: p.page_script_hash for p in fwd.navigation.app_pages}
+                self.page = fwd.navigation.page_script_hash
+            elif kind == "delta" and fwd.delta.WhichOneof("type") == "new_element":
+                self._note_element(action, fwd.delta)
+            elif kind == "script_finished" and fwd.script_finished != EARLY_FOR_RERUN:
+                # a callback's st.rerun() ends the first run early; the rerun it starts is part of the action
+                break
+        self.laps.append((action, time.perf_counter() - t0))
+
+    def _note_element(self, action: str, delta) -> None:
+        el = delta.new_element
+        kind = el.WhichOneof("type")
+        if kind == "exception":
+            self.errors.append(f"{action}: {el.exception.type}: {el.exception.message}")
+            return
+        wid = getattr(getattr(el, kind), "id", "") if kind else ""
+        if wid.startswith("$$ID-"):
+            key = wid.split("-", 2)[2]
+            self.widgets[key] = (wid, delta.fragment_id)
+            if kind == "number_input" and el.number_input.has_max:
+                self.maxima[key] = int(el.number_input.max)
+
+    async def _set(self, action: str, key: str, **value):
+        if key not in self.widgets:
+            raise RuntimeError(f"{action}: widget {key!r} not on the page")
+        wid, fragment_id = self.widgets[key]
+        await self._rerun(action, change=WidgetState(id=wid, **value), fragment_id=fragment_id)
+
+    async def script(self, nav: int, think: float, rng: random.Random):
+        async def pause():
+            await asyncio.sleep(think * rng.uniform(0.5, 1.5))
+
+        await self._rerun("open_home", page="")
+        slides_page = next(h for path, h in self.pages.items() if "Lecture_Slides" in path)
+        await pause()
+        await self._rerun("open_slides", page=slides_page)
+        for _ in range(nav):
+            await pause()
+            await self._set("navigate", "slide_input", int_value=rng.randint(1, self.maxima["slide_input"]))
+        await pause()
+        await self._set("open_thumbs", "show_thumbs", bool_value=True)
+        await pause()
+        await self._set("thumb_page", "thumb_page", int_value=2)
+        await pause()
+        thumbs = [k for k in self.widgets if k.startswith("thumb_btn_")]
+        await self._set("thumb_click", rng.choice(thumbs), trigger_value=True)
+
+
+async def _session(url: str, nav: int, think: float, delay: float, seed: int, finished: list,
+                   done: asyncio.Event, total: int) -> Session:
+    await asyncio.sleep(delay)
+    s = Session(None)
+    try:
+        async with websockets.connect(f"{url}/_stcore/stream", subprotocols=["streamlit"], max_size=None,
+                                      open_timeout=ACTION_TIMEOUT) as s.ws:
+            try:
+                await s.script(nav, think, random.Random(seed))
+            finally:
+                finished.append(s)
+                if len(finished) == total:
+                    done.set()
+            await done.wait()   # keep the tab open until every session is done, for rss_loaded_mb
+    except Exception as e:
+        s.errors.append(f"{type(e).__name__}: {e}")
+        if s not in finished:
+            finished.append(s)
+            if len(finished) == total:
+                done.set()
+    return s
+
+
+async def _swarm(url: str, sessions: int, nav: int, think: float, ramp: float, on_all_done) -> list[Session]:
+    """Run the sessions; `on_all_done()` is called once all have finished, while every tab is still open."""
+    finished, done = [], asyncio.Event()
+    tasks = [asyncio.create_task(_session(url, nav, think, ramp * i / sessions, i, finished, done, sessions))
+             for i in range(sessions)]
+    await done.wait()
+    on_all_done()
+    return await asyncio.gather(*tasks)
+
+
+# ---- run ----
+
+def run(sessions: int, nav: int, think: float, ramp: float, latency: float, entry: str) -> dict:
+    cache_dir = tempfile.mkdtemp(prefix="slides-load-")
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}"
+    with SlideServer(SLIDES, latency=latency) as srv:
+        env = dict(os.environ,
+                   SLIDES_SOURCE="http",
+                   SLIDES_RAW_BASE=srv.url,
+                   SLIDES_DISCOVERY="probe",        # the stand-in has no GitHub contents API
+                   SLIDES_CACHE_DIR=cache_dir)
+        cmd = [sys.executable, "-m", "streamlit", "run", entry, "--server.headless", "true",
+               "--server.port", str(port), "--browser.gatherUsageStats", "false"]
+        # stderr to a file: a pipe nobody reads would block the server once it fills up
+        log = tempfile.TemporaryFile()
+        proc = subprocess.Popen(cmd, cwd=APP_DIR, env=env, stdout=subprocess.DEVNULL, stderr=log)
+        try:
+            _wait_healthy(url, proc)
+            ws_url = url.replace("http", "ws", 1)
+            # one session first: imports, caches and warm-up belong to the baseline, not to the sessions
+            warm = asyncio.run(_swarm(ws_url, 1, 1, 0, 0, lambda: None))
+            if warm[0].errors:
+                raise RuntimeError(f"warm-up session failed: {warm[0].errors[0]}")
+            time.sleep(1)
+            baseline = _tree_rss(proc.pid)
+
+            loaded = {}
+            with _RssSampler(proc.pid) as sampler:
+                t0 = time.perf_counter()
+                result = asyncio.run(_swarm(ws_url, sessions, nav, think, ramp,
+                                            lambda: loaded.update(rss=_tree_rss(proc.pid),
+                                                                  wall=time.perf_counter() - t0)))
+            peak = max(sampler.peak, loaded["rss"])
+        except BaseException:
+            print(f"server stderr (last lines):\n{_tail(log)}", file=sys.stderr)
+            raise
+        finally:
+            proc.terminate()
+            try:
+                proc.wait(10)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+            log.close()
+    shutil.rmtree(cache_dir, ignore_errors=True)
+
+    laps = [lap for s in result for lap in s.laps]
+    everything = [dt for _, dt in laps]
+    metrics = {
+        "rerun_p50_s": percentile(everything, 0.50),
+        "rerun_p95_s": percentile(everything, 0.95),
+        "rerun_p99_s": percentile(everything, 0.99),
+    }
+    for action in ACTIONS:
+        times = [dt for a, dt in laps if a == action]
+        metrics[f"{action}_p50_s"] = percentile(times, 0.50)
+        metrics[f"{action}_p95_s"] = percentile(times, 0.95)
+    metrics["reruns"] = len(laps)
+    metrics["reruns_per_sec"] = round(len(laps) / loaded["wall"], 2)
+    metrics["rss_baseline_mb"] = round(baseline / MB, 1)
+    metrics["rss_loaded_mb"] = round(loaded["rss"] / MB, 1)
+    metrics["rss_peak_mb"] = round(peak / MB, 1)
+    metrics["mem_per_session_mb"] = round((loaded["rss"] - baseline) / MB / sessions, 2)
+    errors = [e for s in result for e in s.errors]
+    metrics["failed_sessions"] = sum(1 for s in result if s.errors)
+
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "streamlit": st.__version__,
+            "entry": entry,
+            "latency_s": latency,
+            "sessions": sessions,
+            "nav_steps": nav,
+            "think_s": think,
+            "ramp_s": ramp,
+        },
+        "metrics": metrics,
+        "errors": errors[:20],
+    }
+
+
+def compare_memory(result: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Names of memory metrics that grew beyond the baseline."""
+    bad = []
+    for key, base in baseline["metrics"].items():
+        if not key.endswith("_mb") or key not in result["metrics"]:
+            continue
+        now = result["metrics"][key]
+        if now > base * (1 + tolerance) + 1:
+            bad.append(f"{key}: {now:.1f} MB vs baseline {base:.1f} MB")
+    return bad
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Load-test the app with N concurrent classroom sessions.")
+    ap.add_argument("--sessions", type=int, default=30, help="concurrent sessions (students)")
+    ap.add_argument("--nav", type=int, default=5, help='"Go to Slide #" reruns per session')
+    ap.add_argument("--think", type=float, default=1.0, help="mean seconds between a session's actions")
+    ap.add_argument("--ramp", type=float, default=5.0, help="seconds over which sessions start")
+    ap.add_argument("--latency", type=float, default=0.05, help="seconds added to every stand-in request")
+    ap.add_argument("--entry", default="serve.py", help="script passed to `streamlit run` (serve.py or HOME.py)")
+    ap.add_argument("--save", help="write results (JSON) to this file")
+    ap.add_argument("--compare", help="baseline JSON to check against")
+    ap.add_argument("--tolerance", type=float, default=0.25, help="allowed relative regression for --compare")
+    args = ap.parse_args(argv)
+
+    result = run(args.sessions, args.nav, args.think, args.ramp, args.latency, args.entry)
+    for key, value in result["metrics"].items():
+        print(f"{key:24s} {value * 1000:9.1f} ms" if key.endswith("_s") else f"{key:24s} {value}")
+    for line in result["errors"]:
+        print("ERROR", line)
+
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, "w") as f:
+            json.dump(result, f, indent=1)
+        print(f"saved {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(result, baseline, args.tolerance) + compare_memory(result, baseline, args.tolerance)
+        for line in regressions:
+            print("REGRESSION", line)
+        if regressions:
+            sys.exit(1)
+    if result["metrics"]["failed_sessions"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
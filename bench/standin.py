@@ -0,0 +1,76 @@
+# ------------------------------------------------------------
+# Local stand-in for raw.githubusercontent.com
+# - serves a folder (the repo's slides/) on 127.0.0.1 from a background thread
+# - adds `latency` seconds to every request, to mimic a slow classroom network
+# - supports HEAD and If-Modified-Since (-> 304), like the real CDN
+# ------------------------------------------------------------
+import functools
+import sys
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _Handler(SimpleHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"   # keep-alive, like the real CDN
+    latency = 0.0
+    counter = None
+
+    def send_head(self):
+        if self.latency:
+            time.sleep(self.latency)
+        self.counter(self.command)
+        return super().send_head()
+
+    def log_message(self, *args):
+        pass
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256   # the default (5) drops parallel connects -> 1 s SYN retries
+
+    def handle_error(self, request, client_address):
+        # clients that give up (Range reads, closed sessions) are normal here, not worth a traceback
+        if isinstance(sys.exc_info()[1], (ConnectionResetError, BrokenPipeError)):
+            return
+        super().handle_error(request, client_address)
+
+
+class SlideServer:
+    """
+    with SlideServer("slides", latency=0.05) as srv:
+        srv.url        -> "http://127.0.0.1:<port>"
+        srv.requests   -> {"GET": n, "HEAD": n}
+    """
+
+    def __init__(self, root: str, latency: float = 0.0, port: int = 0):
+        self.requests = {"GET": 0, "HEAD": 0}
+        lock = threading.Lock()
+
+        def count(method):
+            with lock:
+                self.requests[method] = self.requests.get(method, 0) + 1
+
+        handler = type("Handler", (_Handler,), {"latency": latency, "counter": staticmethod(count)})
+        self._server = _Server(("127.0.0.1", port), functools.partial(handler, directory=root))
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
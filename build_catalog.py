@@ -0,0 +1,43 @@
+# ------------------------------------------------------------
+# Deck catalog for the slides folder
+#
+#   python build_catalog.py
+#   python build_catalog.py --title "260112.=2026. 01. 12. Workshop"
+#
+# Indexes every deck in slides/ (see workshop.catalog) and writes
+# slides/catalog.json. The page builds the same index from a folder listing
+# when it can; the file is for sources that can't list (e.g. raw HTTP hosting
+# without the GitHub API), which then need one request instead of probing.
+# Run it again after adding or removing slides.
+# ------------------------------------------------------------
+import argparse
+import os
+
+from workshop import catalog
+from workshop.config import DECK_TITLES, FILENAME_EXT, SUFFIX_TRY_ORDER
+from workshop.files import write_atomic
+from workshop.sources import LocalSource
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Index the decks in a slides folder.")
+    ap.add_argument("--slides", default=os.path.join(APP_DIR, "slides"), help="folder with the slide images")
+    ap.add_argument("--ext", default=FILENAME_EXT)
+    ap.add_argument("--suffixes", default=",".join(SUFFIX_TRY_ORDER),
+                    help='suffix try order, comma separated ("a," = try "a" then none)')
+    ap.add_argument("--title", action="append", default=[], metavar="PREFIX=TITLE", help="deck title (repeatable; adds to DECK_TITLES in workshop/config.py)")
+    args = ap.parse_args(argv)
+
+    titles = {**DECK_TITLES, **dict(t.split("=", 1) for t in args.title)}
+    cat = catalog.build(LocalSource(args.slides), args.ext, args.suffixes.split(","), titles)
+    out = os.path.join(args.slides, catalog.CATALOG_NAME)
+    write_atomic(out, catalog.dumps(cat))
+    for d in cat["decks"]:
+        print(f"{d['id']:16s} {len(d['slides']):4d} slides  {d['title']}")
+    print(f"{len(cat['decks'])} deck(s) -> {out}")
+
+
+if __name__ == "__main__":
+    main()
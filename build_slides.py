@@ -0,0 +1,82 @@
+# ------------------------------------------------------------
+# Offline asset build for the Lecture Slides page
+#
+#   python build_slides.py                     # every deck in slides/
+#   python build_slides.py --prefix 260112.    # one deck, numbers --start..--end
+#
+# Scans slides/ once and writes one folder per deck (workshop.manifest.deck_dir),
+# e.g. static/slides/260112/:
+#   thumbs/<hash>.w280.webp       thumbnails
+#   variants/<hash>.w<W>.webp     display-size copies of each slide
+#   zoom/<hash>.dzi, <hash>_files/ deep-zoom tile pyramids (workshop.deepzoom; --no-zoom skips them)
+#   manifest.json                 order, suffix resolution, pixel sizes, hashes
+#
+# When a deck's manifest matches the slides folder, the page starts that deck
+# from it: no URL probing and no image work at request time.
+# Run it again after adding/changing slides (a stale manifest is ignored): only
+# added, changed or renamed slides are rendered again, and derivatives of
+# deleted slides (and builds of deleted decks) are removed. --force rebuilds everything.
+# Deck settings come from workshop/config.py, as in the page.
+# ------------------------------------------------------------
+import argparse
+import os
+import time
+
+from workshop import manifest
+from workshop.config import END_INDEX, FILENAME_EXT, START_INDEX, SUFFIX_TRY_ORDER, THUMB_MAX_W
+from workshop.thumbs import VARIANT_WIDTHS
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def report(m: dict, out_dir: str) -> None:
+    c = m["changes"]
+    for kind in ("added", "changed", "renamed", "deleted"):
+        if c[kind]:
+            print(f"{kind:9s} {', '.join(c[kind])}")
+    print(f"{c['unchanged']} slides unchanged; {c['rendered']} images and {c['zoomed']} tile pyramids rendered, "
+          f"{c['reused']} reused, {c['removed']} removed")
+    total = sum(item["bytes"] for s in m["slides"] for item in [s["thumb"], *s["variants"]])
+    tiles = [s["zoom"] for s in m["slides"] if "zoom" in s]
+    if tiles:
+        print(f"deep zoom: {sum(t['count'] for t in tiles)} tiles, {sum(t['bytes'] for t in tiles) / 1024:.0f} KB")
+    print(f"{len(m['slides'])} slides, {total / 1024:.0f} KB of derivatives "
+          f"-> {os.path.join(out_dir, manifest.MANIFEST_NAME)}")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Pre-render slide thumbnails/variants and write a manifest per deck.")
+    ap.add_argument("--slides", default=os.path.join(APP_DIR, "slides"), help="folder with the slide PNGs")
+    ap.add_argument("--out", default=os.path.join(APP_DIR, "static", "slides"), help="output folder (one folder per deck)")
+    ap.add_argument("--prefix", default=None, help="build only this deck (default: every deck in the folder)")
+    ap.add_argument("--ext", default=FILENAME_EXT)
+    ap.add_argument("--start", type=int, default=START_INDEX, help="first slide number (with --prefix)")
+    ap.add_argument("--end", type=int, default=END_INDEX, help="last slide number (with --prefix)")
+    ap.add_argument("--suffixes", default=",".join(SUFFIX_TRY_ORDER),
+                    help='suffix try order, comma separated ("a," = try "a" then none)')
+    ap.add_argument("--thumb-width", type=int, default=THUMB_MAX_W)
+    ap.add_argument("--widths", default=",".join(map(str, VARIANT_WIDTHS)), help="display variant widths")
+    ap.add_argument("--workers", type=int, default=0, help="render processes (0 = one per core)")
+    ap.add_argument("--no-zoom", action="store_true", help="no deep-zoom tile pyramids")
+    ap.add_argument("--force", action="store_true", help="ignore the previous build and render everything")
+    args = ap.parse_args(argv)
+
+    suffixes = args.suffixes.split(",")
+    widths = [int(w) for w in args.widths.split(",") if w]
+
+    t0 = time.perf_counter()
+    if args.prefix is not None:
+        spec = manifest.deck_spec(args.prefix, args.ext, args.start, args.end, suffixes)
+        out_dir = manifest.deck_dir(args.out, args.prefix)
+        built = {args.prefix: manifest.build(args.slides, out_dir, spec, args.thumb_width, widths, args.workers,
+                                             force=args.force, zoom=not args.no_zoom)}
+    else:
+        built = manifest.build_all(args.slides, args.out, args.ext, suffixes, args.thumb_width, widths,
+                                   args.workers, force=args.force, zoom=not args.no_zoom)
+    for prefix, m in built.items():
+        report(m, manifest.deck_dir(args.out, prefix))
+    print(f"{len(built)} deck{'s' if len(built) != 1 else ''} ({time.perf_counter() - t0:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+# ------------------------------------------------------------
+# Static export of the workshop site
+#
+#   python export_site.py                  # -> site/
+#   python -m http.server -d site 8000     # or any plain file server / static host
+#
+# Writes index.html (HOME.py), slides.html (slide player with thumbnails and
+# client-side navigation, slides.html#5 opens slide 5; other decks get
+# slides-<deck>.html, linked from it) and the static content pages as plain
+# HTML. Viewers need no Streamlit session, so a large audience costs one file
+# server instead of one Python session each.
+# Slide derivatives come from build_slides.py, which is run first (incremental).
+# Interactive/embedded pages (Platform links, Message Board) stay on the live
+# app; --app-url adds a link to it.
+# ------------------------------------------------------------
+import argparse
+import os
+import time
+
+from workshop import export, manifest
+from workshop.config import DECK_TITLES, FILENAME_EXT, FILENAME_PREFIX, SUFFIX_TRY_ORDER, THUMB_MAX_W
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+SITE_TITLE = "Bringing Streamlit into the Classroom"
+
+PAGES = [
+    export.Page("HOME.py", "index.html", "HOME"),
+    export.Page("slides", "slides.html", "Lecture Slides"),
+    export.Page("pages/3🌱_Streamlit_samples.py", "samples.html", "Streamlit samples"),
+    export.Page("pages/4🌱_Streamlit_appdev_flow.py", "appdev-flow.html", "Streamlit appdev flow"),
+]
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Export the workshop as a static site.")
+    ap.add_argument("--out", default=os.path.join(APP_DIR, "site"), help="output folder (replaced)")
+    ap.add_argument("--slides", default=os.path.join(APP_DIR, "slides"), help="folder with the slide PNGs")
+    ap.add_argument("--build", default=os.path.join(APP_DIR, "static", "slides"), help="build_slides.py output")
+    ap.add_argument("--app-url", default="", help="URL of the live Streamlit app, linked from every page")
+    args = ap.parse_args(argv)
+
+    t0 = time.perf_counter()
+    built = manifest.build_all(args.slides, args.build, FILENAME_EXT, SUFFIX_TRY_ORDER, THUMB_MAX_W,
+                               log=lambda *a: None)
+    # the page's first deck leads
+    prefixes = sorted(built, key=lambda p: p != FILENAME_PREFIX)
+    for prefix in prefixes:
+        c = built[prefix]["changes"]
+        print(f"slides {prefix}: {len(built[prefix]['slides'])} ({c['rendered']} images rendered, {c['reused']} reused)")
+    decks = [(built[p], manifest.deck_dir(args.build, p), DECK_TITLES.get(p) or p.rstrip("._- ") or "slides")
+             for p in prefixes]
+
+    os.chdir(APP_DIR)   # pages use paths relative to the app folder, as under `streamlit run`
+    report = export.export(args.out, PAGES, decks, SITE_TITLE, app_url=args.app_url)
+
+    total = sum(os.path.getsize(os.path.join(d, f)) for d, _, files in os.walk(args.out) for f in files)
+    print(f"{len(report)} pages, {total / 1024:.0f} KB -> {args.out} ({time.perf_counter() - t0:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+# ------------------------------------------------------------
+# Lossless optimizer for the slide PNGs
+#
+#   python optimize_slides.py --dry-run     # report only
+#   python optimize_slides.py               # replace files that get smaller
+#
+# Drops all-opaque alpha channels, tries an exact palette for slides with
+# <= 256 colours and recompresses (workshop.optimize). A file is replaced only
+# if the new PNG decodes to exactly the same pixels and is smaller.
+# Run build_slides.py afterwards: the manifest notices the new file sizes.
+# ------------------------------------------------------------
+import argparse
+import os
+import time
+
+from workshop.optimize import optimize_file
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Losslessly shrink the slide PNGs.")
+    ap.add_argument("--slides", default=os.path.join(APP_DIR, "slides"), help="folder with the slide PNGs")
+    ap.add_argument("--dry-run", action="store_true", help="report savings without replacing files")
+    ap.add_argument("--no-palette", action="store_true", help="do not try palette (P) mode")
+    args = ap.parse_args(argv)
+
+    names = sorted(n for n in os.listdir(args.slides) if n.lower().endswith(".png"))
+    t0 = time.perf_counter()
+    before = after = 0
+    print(f"{'file':24s} {'mode':>11s} {'bytes':>21s} {'saved':>7s} {'decode ms':>13s}")
+    for name in names:
+        r = optimize_file(os.path.join(args.slides, name), palette=not args.no_palette, write=not args.dry_run)
+        before += r.bytes_before
+        after += r.bytes_after
+        print(f"{r.name:24s} {r.mode_before:>4s} -> {r.mode_after:<4s} "
+              f"{r.bytes_before:>9,d} -> {r.bytes_after:<9,d} {r.saved / r.bytes_before:>6.1%} "
+              f"{r.decode_ms_before:>5.1f} -> {r.decode_ms_after:<5.1f}")
+
+    verb = "would save" if args.dry_run else "saved"
+    print(f"{len(names)} files: {before / 1024:.0f} KB -> {after / 1024:.0f} KB, {verb} "
+          f"{(before - after) / 1024:.0f} KB ({(before - after) / max(before, 1):.1%}) in {time.perf_counter() - t0:.1f}s")
+    if not args.dry_run and after < before:
+        print("slides changed: run `python build_slides.py` to refresh static/slides/")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,130 +1,490 @@
 # ------------------------------------------------------------
 # Lecture Slide Player (Multipage-ready) with Sharp Thumbnails
 # - supports suffix slides like 013a.png when 013.png is missing
+# - probes candidate slides concurrently (or lists the folder in one call)
+# - several decks in one folder: a deck catalog (workshop.catalog) and a deck selector
+# - reads slides from the local slides/ folder or over HTTP (workshop.sources)
+# - starts a deck from its static/slides/<deck>/manifest.json when build_slides.py has been run
+#   and then sends the main slide as a right-sized WebP variant (srcset)
+# - prefetches the slides around the current one (server caches + browser hints)
+# - controls, viewer and thumbnail grid rerun as separate fragments
+# - optional presenter mode: the browser navigates by itself (workshop.presenter)
+# - optional deep zoom: pan/zoom the slide from pre-built tiles (workshop.deepzoom)
+# - main slide and thumbnails show an inline blurred placeholder (LQIP) until the image arrives
+# - times every rerun (workshop.metrics); open the page with ?debug=1 for the timing panel
+# - a background warm-up fills discovery and thumbnails and renews them before they expire
 # ------------------------------------------------------------
 import re
-import io
+import os
+import threading
 import math
+import base64
+import mimetypes
+from contextlib import contextmanager
 import requests
-from PIL import Image
 import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+from workshop import assets, catalog, deepzoom, manifest, metrics, warmup
+from workshop.config import (DECK_TITLES, END_INDEX, FILENAME_EXT, FILENAME_PREFIX, START_INDEX,
+                             SUFFIX_TRY_ORDER, THUMB_MAX_W, WARM_WORKERS)
+from workshop.sources import HttpSource, LocalSource, PartialDiscovery, discover
+from workshop.diskcache import DiskCache
+from workshop.memcache import ByteLRU
+from workshop.thumbs import cached_thumbs, image_info, lqip_background, make_lqip
+from workshop.prefetch import Prefetcher, neighbours
+from workshop.presenter import presenter
 
 # ---------------- Page setup ----------------
 st.set_page_config(page_title="Lecture Slide Player - Workshop", layout="wide")
+_ctx = get_script_run_ctx()
+RERUN = metrics.start_rerun("lecture_slides", _ctx.session_id[:8] if _ctx else "")
 
 # ------------ CONFIG ------------
+# A few settings can also be given as environment variables (SLIDES_SOURCE, SLIDES_RAW_BASE,
+# SLIDES_DISCOVERY, SLIDES_USE_MANIFEST, SLIDES_CACHE_DIR, SLIDES_WARM_UP), e.g. for bench/ runs.
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
 GITHUB_OWNER  = "MK316"
 GITHUB_REPO   = "gnu260112"
 GITHUB_BRANCH = "main"
 FOLDER_PATH   = "slides"
 
-FILENAME_PREFIX = "260112."
-FILENAME_EXT    = ".png"
-START_INDEX     = 1
-END_INDEX       = 21
-
-# If a numbered slide is missing (e.g., 013.png), try these suffixes in order.
-# Put "a" first since you deleted 013.png and only keep 013a.png.
-SUFFIX_TRY_ORDER = ["a", ""]  # tries 013a.png then 013.png (keep "" if you might restore later)
-# If you also use b/c: ["a","b","c",""]
+# Deck settings (FILENAME_PREFIX, FILENAME_EXT, START_INDEX/END_INDEX, SUFFIX_TRY_ORDER,
+# DECK_TITLES, THUMB_MAX_W) are in workshop/config.py, shared with the command-line tools.
+# Decks: every <prefix><number><suffix><ext> group in the folder is a deck (workshop.catalog),
+# indexed from one folder listing, or from slides/catalog.json (build_catalog.py) if the
+# source can't list. FILENAME_PREFIX is the deck shown first; ?deck=<prefix>&slide=<number>
+# in the URL opens another one. START_INDEX/END_INDEX are only probed if there is no catalog.
 
 THUMBS_PER_PAGE = 12
 THUMB_COLS      = 6
-THUMB_MAX_W     = 280
 TIMEOUT         = 8
 
-RAW_BASE = f"https://raw.githubusercontent.com/{GITHUB_OWNER}/{GITHUB_REPO}/{GITHUB_BRANCH}/{FOLDER_PATH}"
+# Thumbnails are built in a process pool: THUMB_WORKERS processes (0 = one per core, up to 8).
+# PREBUILD_ALL_THUMBS=True builds the whole deck on first open instead of one page at a time.
+# The grid does no work until it is opened (THUMBS_START_OPEN); then it builds
+# THUMB_FILL_BATCH thumbnails at a time and shows each batch as soon as it is ready.
+THUMB_WORKERS       = 0
+PREBUILD_ALL_THUMBS = False
+THUMBS_START_OPEN   = False
+THUMB_FILL_BATCH    = 6
+THUMB_PLACEHOLDER   = ("<div style='width:150px; aspect-ratio:16/9; background:#f0f2f6; "
+                       "border-radius:4px;'></div>")
+# Placeholders (LQIP): build_slides.py stores a ~200-byte blurred copy and the average colour of
+# every slide in the manifest; it is inlined as the background of the <img>, so the slide's box
+# is laid out and filled at once and the real image paints over it when it arrives. Without a
+# build, a slide's placeholder comes from its thumbnail once that is in memory (no image work).
+
+# Rendered thumbnails are also kept on disk (keyed by slide content + size/format),
+# so a restart or redeploy serves them without any image work. "" disables it.
+DERIVED_CACHE_DIR   = os.environ.get("SLIDES_CACHE_DIR", os.path.join(APP_DIR, ".cache", "derived"))
+DERIVED_CACHE_BYTES = 200 * 1024 * 1024
+
+# Thumbnails in memory: one store shared by every session, capped at THUMB_STORE_BYTES (LRU).
+THUMB_STORE_BYTES = 32 * 1024 * 1024
+THUMB_STORE_TTL   = 3600
+
+# Catalog, discovery and slide bytes are cached for CACHE_TTL seconds.
+# Warm-up (workshop.warmup, off unless SLIDES_WARM_UP=1): one background job per server
+# process fills the catalog, discovery and every thumbnail of every deck, and rebuilds them
+# WARM_MARGIN seconds before CACHE_TTL / THUMB_STORE_TTL run out, so no viewer hits an
+# expired cache. It renders with WARM_WORKERS processes (workshop/config.py).
+# `python warm_slides.py` (or `streamlit run serve.py`) also warms the disk cache before the first visit.
+CACHE_TTL    = 3600
+WARM_UP      = os.environ.get("SLIDES_WARM_UP", "0") == "1"
+WARM_MARGIN  = 300
+
+# Where slides are read from:
+#   "local" -> the slides/ folder next to HOME.py (works offline; uses "http" if the folder is missing)
+#   "http"  -> RAW_BASE on raw.githubusercontent.com
+SLIDE_SOURCE = os.environ.get("SLIDES_SOURCE", "local")
+LOCAL_DIR    = os.path.join(APP_DIR, FOLDER_PATH)
+
+# Pre-rendered assets from `python build_slides.py`, one folder per deck under BUILD_DIR
+# (workshop.manifest.deck_dir); a deck's build is used only if it still matches its slides.
+USE_MANIFEST   = os.environ.get("SLIDES_USE_MANIFEST", "1") == "1"
+BUILD_DIR      = os.path.join(APP_DIR, "static", "slides")
+BUILD_ROOT_URL = "app/static/slides"   # BUILD_DIR as served by Streamlit (server.enableStaticServing)
+
+# Local slides without a build are served as content-hashed static files (workshop.assets)
+# instead of being inlined as data URIs. `streamlit run serve.py` adds immutable cache headers.
+STATIC_ASSETS = os.environ.get("SLIDES_STATIC_ASSETS", "1") == "1"
+
+# For the srcset fallback `src`, assume a screen this tall when fitting to height.
+ASSUMED_SCREEN_H = 1080
+
+# Warm up the slides within PREFETCH_WINDOW steps of the current one (0 = off):
+# server-side caches in background threads, plus hidden <img> tags so the browser caches them.
+PREFETCH_WINDOW  = 1
+PREFETCH_WORKERS = 2
+
+# Presenter mode: the browser gets the slide URLs once and navigates without the server.
+# It preloads PRESENTER_PRELOAD_AHEAD slides on each side first, then the rest of the deck,
+# and reports the slide it shows once navigation has paused for PRESENTER_REPORT_MS.
+PRESENTER_PRELOAD_AHEAD = 2
+PRESENTER_REPORT_MS     = 800
+
+# Deep zoom: with the tile pyramids from build_slides.py, a toggle swaps the main slide for a
+# pan/zoom viewer that loads only the tiles in view. ZOOM_VIEW_H is its height in px,
+# ZOOM_MAX the largest zoom (screen px per slide px).
+ZOOM_VIEW_H = 720
+ZOOM_MAX    = 4.0
+
+# How the "http" source finds slides:
+#   "listing" -> one GitHub API call lists the folder (falls back to "probe" if it fails)
+#   "probe"   -> check every candidate URL, PROBE_WORKERS at a time
+DISCOVERY_MODE = os.environ.get("SLIDES_DISCOVERY", "listing")
+PROBE_WORKERS  = 16
+
+RAW_BASE = os.environ.get(
+    "SLIDES_RAW_BASE",
+    f"https://raw.githubusercontent.com/{GITHUB_OWNER}/{GITHUB_REPO}/{GITHUB_BRANCH}/{FOLDER_PATH}",
+)
+API_LIST_URL = (
+    f"https://api.github.com/repos/{GITHUB_OWNER}/{GITHUB_REPO}/contents/{FOLDER_PATH}"
+    f"?ref={GITHUB_BRANCH}"
+)
+
+# Per-rerun timings: one JSON line per rerun, process totals in Prometheus text format
+# (refreshed at most every METRICS_PROM_EVERY seconds). "" disables a file.
+METRICS_DIR        = os.environ.get("SLIDES_METRICS_DIR", os.path.join(APP_DIR, ".cache", "metrics"))
+METRICS_JSONL      = os.path.join(METRICS_DIR, "reruns.jsonl") if METRICS_DIR else ""
+METRICS_PROM       = os.path.join(METRICS_DIR, "slides.prom") if METRICS_DIR else ""
+METRICS_PROM_EVERY = 5
+# Timing panel in the sidebar: always, or only with ?debug=1 in the URL.
+DEBUG_PANEL = os.environ.get("SLIDES_DEBUG") == "1" or st.query_params.get("debug") == "1"
 
 
 def natural_key(s: str):
     return [int(t) if t.isdigit() else t.lower() for t in re.split(r"(\d+)", s)]
 
 
-def _get(url: str) -> bytes:
-    r = requests.get(url, timeout=TIMEOUT)
-    r.raise_for_status()
-    return r.content
+def make_source():
+    if SLIDE_SOURCE == "local" and os.path.isdir(LOCAL_DIR):
+        return LocalSource(LOCAL_DIR)
+    return HttpSource(
+        RAW_BASE,
+        api_list_url=API_LIST_URL if DISCOVERY_MODE == "listing" else "",
+        timeout=TIMEOUT,
+        workers=PROBE_WORKERS,
+    )
+
+
+SOURCE = make_source()
 
 
-@st.cache_data(show_spinner=False, ttl=3600)
-def url_exists(url: str) -> bool:
+@st.cache_resource(show_spinner=False)
+def get_disk_cache(root: str, max_bytes: int):
+    """The thumbnail disk cache, or None (no root, or it can't be created: the page runs without it)."""
+    if not root:
+        return None
     try:
-        r = requests.get(url, stream=True, timeout=TIMEOUT)
-        ok = r.status_code == 200
-        r.close()
-        return ok
-    except Exception:
-        return False
+        return DiskCache(root, max_bytes)
+    except OSError:
+        metrics.count("disk_cache.open_error")
+        return None
+
+
+DISK_CACHE = get_disk_cache(DERIVED_CACHE_DIR, DERIVED_CACHE_BYTES)
+
+
+@st.cache_resource(show_spinner=False)
+def get_thumb_store(max_bytes: int, ttl: float):
+    return ByteLRU(max_bytes, ttl)
+
+
+THUMB_STORE = get_thumb_store(THUMB_STORE_BYTES, THUMB_STORE_TTL)
+
+
+# `version` is only part of the cache key: a local file/folder with a new mtime gets a fresh entry.
+@st.cache_data(show_spinner=False, ttl=CACHE_TTL)
+def _read_slide(source, name: str, version=None) -> bytes:
+    metrics.count("slide_bytes.miss")
+    return source.read(name)
+
+
+@metrics.timed("slide_bytes")
+def _get(source, name: str, version=None) -> bytes:
+    return _read_slide(source, name, version)
+
+
+@st.cache_data(show_spinner=False, ttl=CACHE_TTL)
+def load_catalog(source, ext: str, suffix_order: list[str], version=None):
+    """Deck catalog from one listing, else from catalog.json; None if neither is available."""
+    metrics.count("catalog.miss")
+    cat = catalog.build(source, ext, suffix_order, DECK_TITLES)
+    if cat is None:
+        try:
+            cat = catalog.parse(source.read(catalog.CATALOG_NAME), ext, suffix_order)
+        except (OSError, requests.RequestException):
+            cat = None
+    return cat
 
 
-@st.cache_data(show_spinner=False, ttl=3600)
-def discover_slides(raw_base: str, prefix: str, ext: str, start_i: int, end_i: int, suffix_order: list[str]):
+@st.cache_data(show_spinner=False, ttl=CACHE_TTL)
+def discover_slides(source, prefix: str, ext: str, start_i: int, end_i: int, suffix_order: list[str], version=None):
     """
-    Discover slides in strict numeric order:
-      For each number i, choose the FIRST existing candidate among:
-        prefix + i(3digits) + suffix + ext
+    Slide file names in numeric order (see workshop.sources.discover).
+    Raises PartialDiscovery if some candidates could not be checked, so that result is not cached.
+    """
+    metrics.count("discover.miss")
+    return discover(source, prefix, ext, start_i, end_i, suffix_order)
+
+
+def get_thumb_bytes(source, name: str, version=None, max_w: int = THUMB_MAX_W) -> bytes:
+    return get_thumb_batch(source, [name], [version], max_w)[0]
 
-    This allows 013a.png to act as the 13th slide when 013.png is deleted.
+
+@metrics.timed("thumb_batch")
+def get_thumb_batch(source, names: list[str], versions: list, max_w: int = THUMB_MAX_W,
+                    refresh: bool = False, workers: int = THUMB_WORKERS) -> list[bytes]:
+    """
+    Thumbnails in slide order, from THUMB_STORE; misses are built together
+    (disk cache first, then the process pool) and stored for every session.
+    refresh=True (warm-up) also restarts the TTL of the entries that were found.
     """
-    urls = []
-    names = []
+    keys = [(source, name, version, max_w) for name, version in zip(names, versions)]
+    out = [THUMB_STORE.get(k) for k in keys]
+    todo = [i for i, thumb in enumerate(out) if thumb is None]
+    metrics.count("thumb_store.hit", len(out) - len(todo))
+    metrics.count("thumb_store.miss", len(todo))
+    if refresh:
+        for k, thumb in zip(keys, out):
+            if thumb is not None:
+                THUMB_STORE.put(k, thumb)
+    if todo:
+        built = cached_thumbs(source, [names[i] for i in todo], max_w, DISK_CACHE, workers=workers)
+        for i, thumb in zip(todo, built):
+            THUMB_STORE.put(keys[i], thumb)
+            out[i] = thumb
+    return out
+
+
+def pick_variant(variants: list[dict], css_w: float) -> dict:
+    """Smallest variant at least css_w pixels wide (the largest one if none is)."""
+    for v in sorted(variants, key=lambda v: v["width"]):
+        if v["width"] >= css_w:
+            return v
+    return max(variants, key=lambda v: v["width"])
+
+
+def variant_attrs(built: dict, css_w: float, sizes: str) -> str:
+    """src/srcset/sizes attributes for a pre-rendered slide; the browser picks per screen and DPR."""
+    variants = built["variants"]
+    srcset = ", ".join(f'{BUILD_URL}/{v["file"]} {v["width"]}w' for v in variants)
+    src = f'{BUILD_URL}/{pick_variant(variants, css_w)["file"]}'
+    return f'src="{src}" srcset="{srcset}" sizes="{sizes}" width="{built["width"]}" height="{built["height"]}"'
+
+
+@st.cache_data(show_spinner=False, ttl=CACHE_TTL)
+def _lqip_of_thumb(thumb: bytes) -> dict:
+    return make_lqip(thumb)
+
+
+@st.cache_data(show_spinner=False, ttl=CACHE_TTL)
+def _image_info(source, name: str, version=None):
+    try:
+        return image_info(source.read_head(name))
+    except (OSError, SyntaxError, requests.RequestException):
+        return None
 
-    for i in range(start_i, end_i + 1):
-        num = f"{i:03d}"
 
-        chosen = None
-        chosen_name = None
+def slide_lqip(name: str):
+    """
+    The placeholder of `name` (see thumbs.make_lqip), or None if there is none yet. Without a build
+    it comes from the thumbnail, with the slide's own size and "opaque" read from its header.
+    """
+    built = BUILT.get(name)
+    if built:
+        return built.get("lqip")
+    thumb = THUMB_STORE.peek((SOURCE, name, SOURCE.version(name), THUMB_MAX_W))   # not a thumbnail request
+    info = _image_info(SOURCE, name, SOURCE.version(name))
+    return dict(_lqip_of_thumb(thumb), **info) if thumb and info else None
 
-        for suf in suffix_order:
-            name = f"{prefix}{num}{suf}{ext}"
-            url = f"{raw_base}/{name}"
-            if url_exists(url):
-                chosen = url
-                chosen_name = name
-                break
 
-        if chosen:
-            urls.append(chosen)
-            names.append(chosen_name)
-        else:
-            # if a slide is missing, we still continue (you can change to st.error if you want strict)
-            # This is useful if you intentionally have gaps.
+def lqip_style(name: str) -> str:
+    """
+    CSS that shows the placeholder of `name` behind an <img> (empty if there is none). The <img>
+    can't clear it once loaded, so it is left out where it would show through: a slide with
+    transparency (built variants are flattened, so always opaque).
+    """
+    lqip = slide_lqip(name)
+    return f"background: {lqip_background(lqip)};" if lqip and lqip.get("opaque", True) else ""
+
+
+def slide_url(name: str):
+    """A URL the browser can load `name` from, or None."""
+    url = SOURCE.url_for(name)
+    if url is None and STATIC_ASSETS and isinstance(SOURCE, LocalSource):
+        try:
+            url = assets.publish(os.path.join(SOURCE.root, name))
+        except OSError:
             pass
+    return url
+
+
+def slide_src(name: str) -> str:
+    """URL for the browser: slide_url(), or the bytes inlined as a data URI."""
+    url = slide_url(name)
+    if url:
+        return url
+    mime = mimetypes.guess_type(name)[0] or "image/png"
+    raw = _get(SOURCE, name, SOURCE.version(name))
+    return f"data:{mime};base64,{base64.b64encode(raw).decode()}"
 
-    # Already in numeric order due to the loop; no need to sort
-    return urls, names
 
+@st.cache_resource(show_spinner=False)
+def get_prefetcher(workers: int):
+    return Prefetcher(workers)
 
-@st.cache_data(show_spinner=False, ttl=3600)
-def get_thumb_bytes(url: str, max_w: int = THUMB_MAX_W) -> bytes:
-    raw = _get(url)
-    im = Image.open(io.BytesIO(raw)).convert("RGBA")
 
-    w, h = im.size
-    if w > max_w:
-        new_h = int(h * (max_w / w))
-        im = im.resize((max_w, new_h), Image.LANCZOS)
+def warm_slide(ctx, name: str, thumbs: bool):
+    """Background job: fill the server-side caches the next render of `name` will read."""
+    add_script_run_ctx(threading.current_thread(), ctx)  # st.cache_data from a worker thread
+    if name not in BUILT and not slide_url(name):
+        _get(SOURCE, name, SOURCE.version(name))
+    if thumbs and not BUILT:
+        get_thumb_bytes(SOURCE, name, SOURCE.version(name))
 
-    bg = Image.new("RGB", im.size, (255, 255, 255))
-    bg.paste(im, mask=im.split()[-1])
-    im = bg
 
-    buf = io.BytesIO()
-    im.save(buf, format="WEBP", quality=92, method=6)
-    return buf.getvalue()
+def size_attrs(name: str) -> str:
+    """
+    width/height for a slide without a build, so its box has the right shape before the image
+    arrives: the size in its header (empty if that can't be read).
+    """
+    info = _image_info(SOURCE, name, SOURCE.version(name))
+    return f' width="{info["width"]}" height="{info["height"]}"' if info else ""
+
+
+def slide_img_attrs(name: str) -> str:
+    """<img> attributes for `name` at the current display settings."""
+    built = BUILT.get(name)
+    if st.session_state.fit_to_height:
+        if built:
+            aspect = built["width"] / built["height"]
+            vh = st.session_state.vh_percent
+            return variant_attrs(built, ASSUMED_SCREEN_H * vh / 100 * aspect, f"min({vh * aspect:.1f}vh, 100vw)")
+        return f'src="{slide_src(name)}"{size_attrs(name)}'
+    if built:
+        px = st.session_state.display_width_px
+        return variant_attrs(built, px, f"{px}px")
+    return f'src="{slide_src(name)}"{size_attrs(name)}'
+
+
+def prefetch(idx: int):
+    """Warm server caches for the neighbours of slide idx and return hidden <img> tags for the browser."""
+    if PREFETCH_WINDOW <= 0:
+        return ""
+    prefetcher = get_prefetcher(PREFETCH_WORKERS)
+    ctx = get_script_run_ctx()
+    hints = []
+    for j in neighbours(idx, len(filenames), PREFETCH_WINDOW):
+        name = filenames[j]
+        thumbs = st.session_state.get("show_thumbs", False)   # no thumbnail work while the grid is closed
+        prefetcher.submit((name, SOURCE.version(name), bool(BUILT), thumbs), warm_slide, ctx, name, thumbs)
+        if name in BUILT or slide_url(name):   # never inline whole slides just to prefetch
+            hints.append(f'<img {slide_img_attrs(name)} alt="" loading="eager" />')
+    return "".join(hints)
+
+
+@st.cache_data(show_spinner=False)
+def load_manifest(path: str, mtime=None):
+    return manifest.load(path)
+
+
+def current_manifest(prefix: str, names=None):
+    """The build manifest of deck `prefix` if it still describes the deck (and its `names`, if known), else None."""
+    if not USE_MANIFEST:
+        return None
+    path = os.path.join(manifest.deck_dir(BUILD_DIR, prefix), manifest.MANIFEST_NAME)
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+    m = load_manifest(path, mtime)
+    if m is None or m["thumb_max_w"] != THUMB_MAX_W:
+        return None
+    # the number range is the deck's own (build_slides.py builds each catalog deck over its numbers)
+    spec = m["deck"]
+    if (spec["prefix"], spec["ext"], spec["suffix_order"]) != (prefix, FILENAME_EXT, SUFFIX_TRY_ORDER):
+        return None
+    if names is not None and [s["name"] for s in m["slides"]] != names:
+        return None
+    if isinstance(SOURCE, LocalSource) and not manifest.is_current(m, SOURCE.root):
+        return None
+    return m
+
+
+def warm_caches(epoch: int):
+    """Warm-up job: everything the first render of each deck reads, cached under `epoch`."""
+    cat = load_catalog(SOURCE, FILENAME_EXT, SUFFIX_TRY_ORDER, version=(SOURCE.version(), epoch))
+    decks = [(d["id"], d["slides"]) for d in cat["decks"]] if cat and cat["decks"] else [(FILENAME_PREFIX, None)]
+    for prefix, names in decks:
+        if names is None:
+            names = discover_slides(SOURCE, prefix, FILENAME_EXT, START_INDEX, END_INDEX, SUFFIX_TRY_ORDER,
+                                    version=(SOURCE.version(), epoch))
+        if current_manifest(prefix, names):
+            continue    # pre-built: thumbnails and variants are static files
+        for name in names:
+            slide_url(name)
+        get_thumb_batch(SOURCE, names, [SOURCE.version(n) for n in names], refresh=True,
+                        workers=WARM_WORKERS)
+
+
+@st.cache_resource(show_spinner=False)
+def get_warmer(interval: float):
+    return warmup.Warmer(warm_caches, interval, name="lecture_slides warm-up").start()
+
+
+WARMER = get_warmer(min(CACHE_TTL, THUMB_STORE_TTL) - WARM_MARGIN) if WARM_UP else None
+CACHE_EPOCH = WARMER.epoch if WARMER else 0   # part of the cache keys; the warm-up moves it on
 
 
 # ---------- Discover slides ----------
-slides, filenames = discover_slides(
-    RAW_BASE,
-    FILENAME_PREFIX,
-    FILENAME_EXT,
-    START_INDEX,
-    END_INDEX,
-    SUFFIX_TRY_ORDER
-)
+with metrics.span("catalog"):
+    CATALOG = load_catalog(SOURCE, FILENAME_EXT, SUFFIX_TRY_ORDER, version=(SOURCE.version(), CACHE_EPOCH))
+DECKS = catalog.Catalog(CATALOG) if CATALOG and CATALOG["decks"] else None
+
+if DECKS:
+    if "deck" not in st.session_state:
+        wanted = st.query_params.get("deck", FILENAME_PREFIX)
+        st.session_state.deck = wanted if wanted in DECKS else DECKS.ids()[0]
+        if "slide" in st.query_params and st.query_params["slide"].isdigit():
+            st.session_state.slide_idx = DECKS[st.session_state.deck].position_of_number(int(st.query_params["slide"])) or 0
+            st.session_state.slide_input = st.session_state.slide_idx + 1
+    elif st.session_state.deck not in DECKS:      # deck removed from the folder
+        st.session_state.deck = DECKS.ids()[0]
+    DECK = DECKS[st.session_state.deck]
+else:
+    DECK = None
+DECK_PREFIX = DECK.id if DECK else FILENAME_PREFIX
+BUILD_URL = f"{BUILD_ROOT_URL}/{manifest.deck_slug(DECK_PREFIX)}"   # this deck's build, as served
 
-if not slides:
+MANIFEST = current_manifest(DECK_PREFIX, DECK.slides if DECK else None)
+BUILT = {s["name"]: s for s in MANIFEST["slides"]} if MANIFEST else {}
+
+if MANIFEST:
+    filenames = [s["name"] for s in MANIFEST["slides"]]
+elif DECK:
+    filenames = DECK.slides
+else:
+    try:
+        with metrics.span("discover"):
+            filenames = discover_slides(
+                SOURCE,
+                DECK_PREFIX,
+                FILENAME_EXT,
+                START_INDEX,
+                END_INDEX,
+                SUFFIX_TRY_ORDER,
+                version=(SOURCE.version(), CACHE_EPOCH),
+            )
+    except PartialDiscovery as e:
+        filenames = e.names
+        st.warning(f"⚠️ Network problem: could not check {', '.join(e.failed)}. They will be retried on the next reload.")
+
+if not filenames:
     st.error("⚠️ No slide images found in the folder.")
     st.stop()
 
@@ -134,117 +494,339 @@ st.session_state.setdefault("thumb_page", 1)
 st.session_state.setdefault("fit_to_height", True)
 st.session_state.setdefault("vh_percent", 88)
 st.session_state.setdefault("display_width_px", 1000)
-st.session_state.setdefault("thumbs_cache", {})  # url -> bytes
+st.session_state.setdefault("presenter", False)
+st.session_state.setdefault("zoom", False)
+st.session_state.setdefault("show_thumbs", THUMBS_START_OPEN)
 
 
 # --- Navigation callbacks ---
+# Controls, viewer and thumbnail grid are keyed fragments: a callback reruns just the
+# fragments that show what it changed, never discovery or the rest of the page.
+REDRAW = ["controls", "viewer"]
+
+
 def go_prev():
-    st.session_state.slide_idx = (st.session_state.slide_idx - 1) % len(slides)
+    st.session_state.slide_idx = (st.session_state.slide_idx - 1) % len(filenames)
 
 def go_next():
-    st.session_state.slide_idx = (st.session_state.slide_idx + 1) % len(slides)
+    st.session_state.slide_idx = (st.session_state.slide_idx + 1) % len(filenames)
 
 def go_to_slide():
     num = st.session_state.slide_input
-    if 1 <= num <= len(slides):
+    if 1 <= num <= len(filenames):
         st.session_state.slide_idx = num - 1
+    st.rerun(REDRAW)
 
 def go_first():
     st.session_state.slide_idx = 0
     st.session_state.slide_input = 1
+    st.rerun(REDRAW)
+
+def deck_changed():
+    # another deck: new slide list, so the whole page reruns
+    st.session_state.slide_idx = 0
+    st.session_state.slide_input = 1
+    st.session_state.thumb_page = 1
+    st.rerun()
+
+def go_thumb(i: int):
+    st.session_state.slide_idx = i
+    st.session_state.slide_input = i + 1
+    st.rerun(REDRAW)
+
+def redraw():
+    st.rerun(REDRAW)
+
+def presenter_moved():
+    # the browser already shows the slide: only the counter needs to catch up
+    st.session_state.slide_idx = st.session_state.presenter_view
+    st.session_state.slide_input = st.session_state.slide_idx + 1
+    st.rerun(["controls"])
+
+
+def presenter_slides():
+    """The deck for presenter mode, or None if some slide has no URL (unbuilt local slides)."""
+    slides = []
+    for name in filenames:
+        built = BUILT.get(name)
+        if built:
+            slides.append({
+                "src": f'{BUILD_URL}/{pick_variant(built["variants"], ASSUMED_SCREEN_H * built["width"] / built["height"])["file"]}',
+                "srcset": [[f'{BUILD_URL}/{v["file"]}', v["width"]] for v in built["variants"]],
+                "width": built["width"],
+                "height": built["height"],
+            })
+        elif slide_url(name):
+            slides.append({"src": slide_url(name)})
+        else:
+            return None
+        lqip = slide_lqip(name)
+        if lqip:
+            slides[-1].update(lqip=lqip, width=lqip["width"], height=lqip["height"])
+    return slides
+
+
+def gauges() -> dict:
+    """Point-in-time values for the Prometheus file, next to the metrics totals."""
+    out = {f"thumb_store_{k}": v for k, v in THUMB_STORE.stats().items()}
+    if DISK_CACHE:
+        out["disk_cache_bytes"] = DISK_CACHE.size()
+    if WARMER:
+        warm = WARMER.status()
+        out.update(warm_ready=int(warm["state"] == "ready"), warm_runs=warm["runs"],
+                   warm_last_seconds=warm["last_seconds"] or 0)
+    return out
+
+
+def debug_panel(row: dict, title: str):
+    with st.expander(title, expanded=True):
+        st.caption(f"Rerun: {row['total_s'] * 1000:.1f} ms")
+        st.table({
+            "span": list(row["spans"]),
+            "calls": [v["n"] for v in row["spans"].values()],
+            "ms": [round(v["s"] * 1000, 1) for v in row["spans"].values()],
+        })
+        if row["counts"]:
+            st.table({"event": list(row["counts"]), "n": list(row["counts"].values())})
+        st.caption("Thumbnail store: " + ", ".join(f"{k} {v}" for k, v in THUMB_STORE.stats().items()))
+        if WARMER:
+            st.caption("Warm-up: " + ", ".join(f"{k} {v}" for k, v in WARMER.status().items() if v not in (None, "")))
+
+
+@contextmanager
+def fragment_metrics(name: str):
+    """
+    Time a fragment; a fragment-only rerun skips the page body, so it is logged as its own rerun
+    and, with the debug panel on, shown in TIMING in place of this fragment's previous row.
+    """
+    ctx = get_script_run_ctx()
+    rec = None
+    if ctx and ctx.fragment_ids_this_run:
+        rec = metrics.start_rerun(f"lecture_slides.{name}", ctx.session_id[:8])
+    with metrics.span(f"render.{name}"):
+        yield
+    if rec:
+        row = metrics.finish_rerun(rec, METRICS_JSONL, METRICS_PROM, METRICS_PROM_EVERY, extra_gauges=gauges())
+    if TIMING:
+        with TIMING:
+            if rec:
+                debug_panel(row, f"⏱️ Timing ({name}, last fragment rerun)")
+            else:
+                st.empty()   # a fragment can only redraw into a container it wrote to in the full run
 
 
 # ===== Sidebar =====
-with st.sidebar:
-    st.subheader("Controls")
-
-    st.markdown(
-        f"<div style='text-align:right; font-weight:700; font-size:16px;'>"
-        f"{st.session_state.slide_idx + 1} / {len(slides)}"
-        f"</div>",
-        unsafe_allow_html=True
-    )
+@st.fragment(key="controls")
+def controls():
+    with fragment_metrics("controls"):
+        st.subheader("Controls")
+
+        if DECKS and len(DECKS.decks) > 1:
+            st.selectbox(
+                "Deck",
+                DECKS.ids(),
+                format_func=lambda d: f"{DECKS[d].title} ({len(DECKS[d])})",
+                key="deck",
+                on_change=deck_changed,
+            )
+
+        st.markdown(
+            f"<div style='text-align:right; font-weight:700; font-size:16px;'>"
+            f"{st.session_state.slide_idx + 1} / {len(filenames)}"
+            f"</div>",
+            unsafe_allow_html=True
+        )
+
+        # only one of the two sliders is drawn; re-setting both keeps the other one's value
+        # (Streamlit drops the state of widgets that were not drawn), which the viewer still reads
+        st.session_state.vh_percent = st.session_state.vh_percent
+        st.session_state.display_width_px = st.session_state.display_width_px
+        st.toggle("Fit main slide to screen height", key="fit_to_height", on_change=redraw)
+        if st.session_state.fit_to_height:
+            st.slider("Height % of screen", 60, 95, key="vh_percent", on_change=redraw)
+        else:
+            st.slider("Slide width (px)", 700, 1400, key="display_width_px", on_change=redraw)
 
-    st.toggle("Fit main slide to screen height", key="fit_to_height")
-    if st.session_state.fit_to_height:
-        st.slider("Height % of screen", 60, 95, key="vh_percent")
-    else:
-        st.slider("Slide width (px)", 700, 1400, key="display_width_px")
-
-    st.number_input(
-        "Go to Slide #",
-        min_value=1,
-        max_value=len(slides),
-        step=1,
-        key="slide_input",
-        on_change=go_to_slide
-    )
+        st.number_input(
+            "Go to Slide #",
+            min_value=1,
+            max_value=len(filenames),
+            step=1,
+            key="slide_input",
+            on_change=go_to_slide
+        )
+
+        st.button("⏮️ Go to Start (Slide 1)", use_container_width=True, on_click=go_first)
+
+        st.toggle("Presenter mode (navigate in the browser)", key="presenter", on_change=redraw)
 
-    st.button("⏮️ Go to Start (Slide 1)", use_container_width=True, on_click=go_first)
+        # always drawn (disabled without tile pyramids), so its state survives decks without a build
+        st.toggle("🔍 Deep zoom (drag to pan, scroll to zoom)", key="zoom", on_change=redraw,
+                  disabled=not any("zoom" in s for s in BUILT.values()),
+                  help="Needs the tile pyramids from `python build_slides.py`.")
+
+
+# the debug panel goes below the controls: the full rerun's timing, then each fragment's
+CONTROLS = st.sidebar.container()
+TIMING = st.sidebar.container() if DEBUG_PANEL else None
+with CONTROLS:
+    controls()
 
 
 # ===== Main Slide =====
-idx = st.session_state.slide_idx
-
-if st.session_state.fit_to_height:
-    st.markdown(
-        f"""
-        <div style="display:flex; justify-content:center;">
-            <img
-                src="{slides[idx]}"
-                alt="Slide {idx + 1}"
-                style="
-                    max-height: {st.session_state.vh_percent}vh;
-                    width: auto;
-                    height: auto;
-                    object-fit: contain;
-                    border: 1px solid #ccc;
-                    box-shadow: 2px 2px 6px rgba(0,0,0,0.1);
-                "
-            />
-        </div>
-        """,
-        unsafe_allow_html=True,
-    )
-else:
-    st.image(
-        slides[idx],
-        width=st.session_state.display_width_px,
-        use_container_width=False
-    )
+@st.fragment(key="viewer")
+def viewer():
+    with fragment_metrics("viewer"):
+        idx = st.session_state.slide_idx
+        zoom = BUILT[filenames[idx]].get("zoom") if st.session_state.get("zoom", False) and filenames[idx] in BUILT else None
+        slides = presenter_slides() if st.session_state.presenter and not zoom else None
+        if st.session_state.presenter and not zoom and slides is None:
+            st.info("Presenter mode needs slide URLs: run `python build_slides.py`, use the http source "
+                    "or turn on STATIC_ASSETS.")
+
+        if slides:
+            presenter(
+                slides,
+                index=idx,
+                fit_to_height=st.session_state.fit_to_height,
+                vh_percent=st.session_state.vh_percent,
+                width_px=st.session_state.display_width_px,
+                preload_ahead=PRESENTER_PRELOAD_AHEAD,
+                report_delay_ms=PRESENTER_REPORT_MS,
+                key="presenter_view",
+                on_change=presenter_moved,
+            )
+            return
+
+        if zoom:
+            deepzoom.viewer(zoom, BUILD_URL, ZOOM_VIEW_H, ZOOM_MAX, label=f"Slide {idx + 1}")
+        elif st.session_state.fit_to_height:
+            st.markdown(
+                f"""
+                <div style="display:flex; justify-content:center;">
+                    <img
+                        {slide_img_attrs(filenames[idx])}
+                        alt="Slide {idx + 1}"
+                        style="
+                            max-height: {st.session_state.vh_percent}vh;
+                            max-width: 100%;
+                            width: auto;
+                            height: auto;
+                            object-fit: contain;
+                            border: 1px solid #ccc;
+                            box-shadow: 2px 2px 6px rgba(0,0,0,0.1);
+                            {lqip_style(filenames[idx])}
+                        "
+                    />
+                </div>
+                """,
+                unsafe_allow_html=True,
+            )
+        elif filenames[idx] in BUILT or slide_url(filenames[idx]):
+            px = st.session_state.display_width_px
+            st.markdown(
+                f"""
+                <img
+                    {slide_img_attrs(filenames[idx])}
+                    alt="Slide {idx + 1}"
+                    style="width: {px}px; max-width: 100%; height: auto; {lqip_style(filenames[idx])}"
+                />
+                """,
+                unsafe_allow_html=True,
+            )
+        else:
+            st.image(
+                _get(SOURCE, filenames[idx], SOURCE.version(filenames[idx])),
+                width=st.session_state.display_width_px,
+                use_container_width=False
+            )
+
+        prefetch_html = prefetch(idx)
+        if prefetch_html:
+            st.markdown(f'<div style="display:none">{prefetch_html}</div>', unsafe_allow_html=True)
+
+        st.caption(f"Slide {idx + 1} / {len(filenames)}   ·   File: {filenames[idx]}")
 
-st.caption(f"Slide {idx + 1} / {len(slides)}   ·   File: {filenames[idx]}")
+
+viewer()
 
 
 # ===== Thumbnails =====
-with st.expander("📑 Thumbnails", expanded=False):
-    total = len(slides)
-    pages = max(1, math.ceil(total / THUMBS_PER_PAGE))
+def thumb_cell(name: str) -> str:
+    """
+    What a thumbnail cell shows first: with a build, the thumbnail itself (a static file)
+    over its placeholder; otherwise the placeholder until the thumbnail is ready.
+    """
+    built = BUILT.get(name)
+    if built:
+        t = built["thumb"]
+        return (f'<img src="{BUILD_URL}/{t["file"]}" width="{t["width"]}" height="{t["height"]}" alt="" '
+                f'decoding="async" style="width:150px; height:auto; border-radius:4px; {lqip_style(name)}" />')
+    lqip = slide_lqip(name)
+    if lqip:
+        return (f"<div style='width:150px; aspect-ratio:{lqip['width']}/{lqip['height']}; "
+                f"background:{lqip_background(lqip)}; border-radius:4px;'></div>")
+    return THUMB_PLACEHOLDER
+
+
+@st.fragment(key="thumbs")
+def thumbnail_grid():
+    """
+    Nothing but the toggle until the grid is opened; changing the page reruns only this grid.
+    Cells are laid out first and filled as their thumbnails become ready.
+    """
+    with fragment_metrics("thumbnails"):
+        if not st.toggle("📑 Thumbnails", key="show_thumbs"):
+            return
+
+        total = len(filenames)
+        pages = max(1, math.ceil(total / THUMBS_PER_PAGE))
+
+        cols_top = st.columns(3)
+        with cols_top[0]:
+            st.caption(f"Total slides: {total}")
+        with cols_top[1]:
+            st.number_input("Thumbnail page", min_value=1, max_value=pages, step=1, key="thumb_page")
+        with cols_top[2]:
+            st.caption(f"Page size: {THUMBS_PER_PAGE}")
+
+        start = (st.session_state.thumb_page - 1) * THUMBS_PER_PAGE
+        end = min(start + THUMBS_PER_PAGE, total)
+        page_names = filenames[start:end]
+
+        cols = st.columns(min(THUMB_COLS, THUMBS_PER_PAGE), gap="small")
+        slots = []
+
+        for local_i, name in enumerate(page_names):
+            global_idx = start + local_i
+            col = cols[local_i % len(cols)]
+
+            with col:
+                # the click only redraws the viewer and the counter, not this grid
+                st.button(f"{global_idx + 1}", key=f"thumb_btn_{global_idx}", use_container_width=True,
+                          on_click=go_thumb, args=(global_idx,))
+                slot = st.empty()
+                slot.markdown(thumb_cell(name), unsafe_allow_html=True)
+                slots.append(slot)
 
-    cols_top = st.columns(3)
-    with cols_top[0]:
-        st.caption(f"Total slides: {total}")
-    with cols_top[1]:
-        st.number_input("Thumbnail page", min_value=1, max_value=pages, step=1, key="thumb_page")
-    with cols_top[2]:
-        st.caption(f"Page size: {THUMBS_PER_PAGE}")
+        if BUILT:
+            return   # the cells already are the pre-rendered thumbnails, no image work here
 
-    start = (st.session_state.thumb_page - 1) * THUMBS_PER_PAGE
-    end = min(start + THUMBS_PER_PAGE, total)
-    page_urls = slides[start:end]
+        for i in range(0, len(page_names), THUMB_FILL_BATCH):
+            names = page_names[i:i + THUMB_FILL_BATCH]
+            for slot, thumb in zip(slots[i:], get_thumb_batch(SOURCE, names, [SOURCE.version(n) for n in names])):
+                slot.image(thumb, width=150)
 
-    cols = st.columns(min(THUMB_COLS, THUMBS_PER_PAGE), gap="small")
+        if PREBUILD_ALL_THUMBS:
+            rest = [n for n in filenames if n not in page_names]
+            get_thumb_batch(SOURCE, rest, [SOURCE.version(n) for n in rest])
 
-    for local_i, url in enumerate(page_urls):
-        global_idx = start + local_i
-        col = cols[local_i % len(cols)]
 
-        with col:
-            if url not in st.session_state.thumbs_cache:
-                st.session_state.thumbs_cache[url] = get_thumb_bytes(url)
+thumbnail_grid()
 
-            if st.button(f"{global_idx + 1}", key=f"thumb_btn_{global_idx}", use_container_width=True):
-                st.session_state.slide_idx = global_idx
-                st.rerun()
 
-            st.image(st.session_state.thumbs_cache[url], width=150)
+# ===== Timing =====
+row = metrics.finish_rerun(RERUN, METRICS_JSONL, METRICS_PROM, METRICS_PROM_EVERY, extra_gauges=gauges())
+if TIMING:
+    with TIMING:
+        debug_panel(row, "⏱️ Timing (last full rerun)")
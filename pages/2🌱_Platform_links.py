@@ -1,5 +1,6 @@
 import streamlit as st
-import streamlit.components.v1 as components
+
+from workshop.embeds import lazy_html
 
 st.set_page_config(page_title="Starter Platforms", layout="wide")
 
@@ -147,10 +148,12 @@ with tab_trends:
     )
 
 
+    # loaded only when this tab is opened (st.tabs renders every tab); the widget draws into #embed
     trends_html = """
     <script type="text/javascript" src="https://ssl.gstatic.com/trends_nrtr/4284_RC01/embed_loader.js"></script>
     <script type="text/javascript">
-    trends.embed.renderExploreWidget(
+    trends.embed.renderExploreWidgetTo(
+      document.getElementById("embed"),
       "TIMESERIES",
       {
         "comparisonItem":[
@@ -170,5 +173,5 @@ with tab_trends:
     </script>
     """
 
-    components.html(trends_html, height=750, scrolling=True)
+    lazy_html(trends_html, height=750, label="📈 Google Trends: Github · Colab · Huggingface · Streamlit", scrolling=True)
 
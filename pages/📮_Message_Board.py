@@ -1,5 +1,6 @@
 import streamlit as st
-import streamlit.components.v1 as components
+
+from workshop.embeds import lazy_iframe
 
 def main():
     st.caption("💙 Padlet: message board")
@@ -7,11 +8,9 @@ def main():
     # Padlet embed URL (you need to replace this with your actual Padlet embed URL)
     padlet_url = "https://padlet.com/mirankim316/260112"
 
-    # Create an iframe to embed the Padlet
-    padlet_iframe = f"<iframe src='{padlet_url}' width='100%' height='600' frameborder='0' allow='autoplay'></iframe>"
-
-    # Display the iframe in Streamlit
-    components.html(padlet_iframe, height=600)
+    # Embed the Padlet; it is the first thing on the page, so it is fetched only when clicked
+    lazy_iframe(padlet_url, height=600, label="💙 Padlet message board", trigger="click", allow="autoplay",
+                title="Padlet")
 
 if __name__ == "__main__":
     main()
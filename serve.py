@@ -0,0 +1,45 @@
+# ------------------------------------------------------------
+# Production entry point
+#
+#   streamlit run serve.py
+#
+# The same app as `streamlit run HOME.py`, plus:
+# - long-lived immutable Cache-Control headers for content-hashed files under
+#   app/static/ (workshop.assets, build_slides.py output), so repeat visits load
+#   them from the browser cache without revalidating
+# - the warm_slides.py warm-up in the background at server start, with WARM_WORKERS
+#   processes (workshop/config.py) like the page's own warm-up;
+#   GET /warmup reports every warm-up of the process (200 when all are ready, else 503)
+# ------------------------------------------------------------
+from contextlib import asynccontextmanager
+
+import streamlit as st
+from starlette.middleware import Middleware
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+import warm_slides
+from workshop import warmup
+from workshop.config import WARM_WORKERS
+from workshop.assets import ImmutableCacheMiddleware
+
+
+@asynccontextmanager
+async def lifespan(app):
+    warmer = warmup.Warmer(lambda epoch: warm_slides.run(workers=WARM_WORKERS), None, name="disk warm-up").start()
+    yield
+    warmer.stop()
+
+
+async def warmup_status(request):
+    statuses = warmup.statuses()
+    ready = all(s["state"] == "ready" for s in statuses)
+    return JSONResponse({"ready": ready, "warmers": statuses}, status_code=200 if ready else 503)
+
+
+app = st.App(
+    "HOME.py",
+    lifespan=lifespan,
+    routes=[Route("/warmup", warmup_status)],
+    middleware=[Middleware(ImmutableCacheMiddleware)],
+)
@@ -0,0 +1,60 @@
+# ------------------------------------------------------------
+# Pre-flight warm-up for the Lecture Slides page
+#
+#   python warm_slides.py        # e.g. in the deploy step, before `streamlit run`
+#
+# Lists the slide decks once, renders every thumbnail into the disk cache and
+# copies every slide to static/assets/ (workshop.assets), so the first visitor
+# after a deploy finds them ready. Decks covered by a current build_slides.py
+# manifest are only listed. Prints what it did and how long it took.
+# `streamlit run serve.py` runs the same warm-up in the background at server start
+# and reports readiness at /warmup; the page's in-memory caches are warmed (and
+# renewed before they expire) by the page itself, see CONFIG there.
+# Deck settings come from workshop/config.py, as in the page.
+# ------------------------------------------------------------
+import argparse
+import os
+import time
+
+from workshop import manifest, warmup
+from workshop.config import FILENAME_EXT, SUFFIX_TRY_ORDER, THUMB_MAX_W
+from workshop.diskcache import DiskCache
+from workshop.sources import LocalSource
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+SLIDES_DIR          = os.path.join(APP_DIR, "slides")
+BUILD_DIR           = os.path.join(APP_DIR, "static", "slides")
+DERIVED_CACHE_DIR   = os.environ.get("SLIDES_CACHE_DIR", os.path.join(APP_DIR, ".cache", "derived"))
+DERIVED_CACHE_BYTES = 200 * 1024 * 1024
+
+
+def prebuilt_decks(slides_dir: str, build_dir: str) -> set:
+    """Deck prefixes with a current build_slides.py manifest."""
+    return set(manifest.current_decks(build_dir, slides_dir, THUMB_MAX_W))
+
+
+def run(slides_dir: str = SLIDES_DIR, cache_dir: str = DERIVED_CACHE_DIR, publish: bool = True,
+        workers: int = 0, log=None) -> dict:
+    source = LocalSource(slides_dir)
+    disk_cache = DiskCache(cache_dir, DERIVED_CACHE_BYTES) if cache_dir else None
+    return warmup.preflight(source, FILENAME_EXT, SUFFIX_TRY_ORDER, THUMB_MAX_W, disk_cache, publish=publish,
+                            workers=workers, skip=prebuilt_decks(slides_dir, BUILD_DIR), log=log)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Warm the Lecture Slides disk caches before the first visitor.")
+    ap.add_argument("--slides", default=SLIDES_DIR, help="folder with the slide PNGs")
+    ap.add_argument("--cache-dir", default=DERIVED_CACHE_DIR, help='thumbnail disk cache ("" = none)')
+    ap.add_argument("--no-publish", action="store_true", help="do not copy slides to static/assets/")
+    ap.add_argument("--workers", type=int, default=0, help="render processes (0 = one per core)")
+    args = ap.parse_args(argv)
+
+    t0 = time.perf_counter()
+    r = run(args.slides, args.cache_dir, publish=not args.no_publish, workers=args.workers, log=print)
+    print(f"ready: {r['decks']} decks, {r['slides']} slides, {r['thumbs']} thumbnails, "
+          f"{r['published']} slides published in {time.perf_counter() - t0:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+"""Helpers shared by the workshop app's pages (slide sources, caches, image work)."""
@@ -0,0 +1,89 @@
+# ------------------------------------------------------------
+# Bundled files as immutable static assets
+# - publish(): copy a file of this checkout to static/assets/<stem>.<hash><ext>
+#   and return its app/static/... URL (server.enableStaticServing)
+# - a new file content gets a new name, so the URL can be cached forever
+# - ImmutableCacheMiddleware: Streamlit's app/static route sends no Cache-Control,
+#   so browsers revalidate; serve.py adds "immutable" for content-hashed names
+# ------------------------------------------------------------
+import hashlib
+import os
+import re
+import threading
+
+from workshop.files import copy_atomic
+
+APP_DIR    = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ASSET_DIR  = os.path.join(APP_DIR, "static", "assets")
+ASSET_URL  = "app/static/assets"
+HASH_CHARS = 12
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+# <anything>.<12+ hex chars>[.w<width>].<ext>: publish() names and build_slides.py output;
+# <12+ hex chars>_files/<level>/<col>_<row>.<ext>: deep-zoom tiles (workshop.deepzoom)
+HASHED_NAME = re.compile(r"(^|[./])[0-9a-f]{12,}(\.w\d+)?\.[A-Za-z0-9]+$"
+                         r"|/[0-9a-f]{12,}_files/\d+/\d+_\d+\.[A-Za-z0-9]+$")
+
+# (path, mtime_ns, size) -> URL
+_published = {}
+_lock = threading.Lock()
+
+
+def hashed_name(path: str) -> str:
+    with open(path, "rb") as f:
+        digest = hashlib.file_digest(f, "sha256").hexdigest()
+    stem, ext = os.path.splitext(os.path.basename(path))
+    return f"{stem}.{digest[:HASH_CHARS]}{ext}"
+
+
+def publish(path: str, asset_dir: str = ASSET_DIR, url_base: str = ASSET_URL) -> str:
+    """URL of `path` (relative to the app folder, or absolute) as a content-hashed static asset."""
+    path = path if os.path.isabs(path) else os.path.join(APP_DIR, path)
+    st = os.stat(path)
+    memo_key = (path, st.st_mtime_ns, st.st_size, asset_dir)
+    with _lock:
+        url = _published.get(memo_key)
+    if url is None:
+        name = hashed_name(path)
+        target = os.path.join(asset_dir, name)
+        if not os.path.isfile(target):
+            copy_atomic(path, target)
+        url = f"{url_base}/{name}"
+        with _lock:
+            _published[memo_key] = url
+    return url
+
+
+def for_st_image(url: str) -> str:
+    """st.image() only treats /app/static/... (leading slash) as a static URL."""
+    return f"/{url}" if url.startswith("app/static/") else url
+
+
+def image_url(path: str, fallback: str) -> str:
+    """st.image() URL of publish(path) if the file is part of this checkout, else `fallback` (e.g. a raw URL)."""
+    try:
+        return for_st_image(publish(path))
+    except OSError:
+        return fallback
+
+
+class ImmutableCacheMiddleware:
+    """ASGI middleware: long-lived immutable Cache-Control for content-hashed files under app/static/."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        path = scope.get("path", "") if scope["type"] == "http" else ""
+        if "/app/static/" not in path or not HASHED_NAME.search(path):
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_cache(message):
+            if message["type"] == "http.response.start" and message["status"] == 200:
+                headers = [(k, v) for k, v in message.get("headers", []) if k.lower() != b"cache-control"]
+                headers.append((b"cache-control", IMMUTABLE.encode()))
+                message = dict(message, headers=headers)
+            await send(message)
+
+        await self.app(scope, receive, send_with_cache)
@@ -0,0 +1,104 @@
+# ------------------------------------------------------------
+# Deck catalog
+# - one index of every deck in a slides folder and its ordered slides,
+#   built from a single listing (no number-range probing)
+# - a deck is every file named <prefix><number><suffix><ext>; the number must
+#   follow a non-digit, e.g. 260112.001.png, 260112.013a.png -> deck "260112."
+# - per number the first suffix in suffix_order wins, as in sources.discover()
+# - catalog.json in the slides folder lets an HTTP source skip even the listing
+# ------------------------------------------------------------
+import json
+import re
+
+from workshop.sources import SlideSource
+
+CATALOG_NAME    = "catalog.json"
+CATALOG_VERSION = 1
+
+
+def _pattern(ext: str):
+    return re.compile(rf"^(?P<prefix>.*?\D|)(?P<num>\d+)(?P<suffix>[a-z]*){re.escape(ext)}$")
+
+
+def index_names(names: list[str], ext: str, suffix_order: list[str], titles: dict = None) -> dict:
+    """Catalog dict for the file `names` (a folder listing); unknown suffixes are ignored."""
+    rank = {suf: r for r, suf in enumerate(suffix_order)}
+    pat = _pattern(ext)
+    best = {}   # prefix -> {number: (rank, name)}
+    for name in names:
+        m = pat.match(name)
+        if not m or m["suffix"] not in rank:
+            continue
+        slot = best.setdefault(m["prefix"], {})
+        num = int(m["num"])
+        cand = (rank[m["suffix"]], name)
+        if num not in slot or cand < slot[num]:
+            slot[num] = cand
+    titles = titles or {}
+    decks = [
+        {
+            "id": prefix,
+            "title": titles.get(prefix) or prefix.rstrip("._- ") or "slides",
+            "numbers": sorted(slot),
+            "slides": [slot[n][1] for n in sorted(slot)],
+        }
+        for prefix, slot in sorted(best.items())
+    ]
+    return {"version": CATALOG_VERSION, "ext": ext, "suffix_order": list(suffix_order), "decks": decks}
+
+
+def build(source: SlideSource, ext: str, suffix_order: list[str], titles: dict = None):
+    """Index the source from one list_names() call, or None if the source can't list."""
+    listed = source.list_names()
+    if listed is None:
+        return None
+    return index_names(listed, ext, suffix_order, titles)
+
+
+def parse(raw: bytes, ext: str, suffix_order: list[str]):
+    """A catalog.json body, or None if it is unreadable or was built with other settings."""
+    try:
+        cat = json.loads(raw)
+    except (ValueError, UnicodeDecodeError):
+        return None
+    if (not isinstance(cat, dict) or cat.get("version") != CATALOG_VERSION
+            or cat.get("ext") != ext or cat.get("suffix_order") != list(suffix_order)):
+        return None
+    return cat
+
+
+def dumps(cat: dict) -> bytes:
+    return json.dumps(cat, indent=1).encode()
+
+
+class Deck:
+    """One catalog deck with O(1) lookup by slide number."""
+
+    def __init__(self, entry: dict):
+        self.id = entry["id"]
+        self.title = entry["title"]
+        self.slides = entry["slides"]
+        self.numbers = entry["numbers"]
+        self._by_number = {n: i for i, n in enumerate(self.numbers)}
+
+    def __len__(self):
+        return len(self.slides)
+
+    def position_of_number(self, number: int):
+        """Index of the slide numbered `number` (gaps allowed), or None."""
+        return self._by_number.get(number)
+
+
+class Catalog:
+    def __init__(self, cat: dict):
+        self.decks = [Deck(d) for d in cat["decks"]]
+        self._by_id = {d.id: d for d in self.decks}
+
+    def __contains__(self, deck_id: str):
+        return deck_id in self._by_id
+
+    def __getitem__(self, deck_id: str) -> Deck:
+        return self._by_id[deck_id]
+
+    def ids(self) -> list[str]:
+        return [d.id for d in self.decks]
@@ -0,0 +1,25 @@
+# ------------------------------------------------------------
+# Deck settings shared by the Lecture Slides page and the command-line tools
+# (build_slides.py, build_catalog.py, warm_slides.py, export_site.py, serve.py, bench/)
+# - which files are slides: <prefix><number><suffix><ext>, e.g. 260112.013a.png
+# - the thumbnail width, which is part of every cache key and manifest
+# - how many processes background warm-ups render with while the app serves viewers
+# ------------------------------------------------------------
+
+FILENAME_PREFIX = "260112."   # the deck shown first
+FILENAME_EXT    = ".png"
+START_INDEX     = 1           # only probed when there is no catalog (workshop.catalog)
+END_INDEX       = 21
+
+# If a numbered slide is missing (e.g., 013.png), try these suffixes in order.
+# Put "a" first since you deleted 013.png and only keep 013a.png.
+SUFFIX_TRY_ORDER = ["a", ""]  # tries 013a.png then 013.png (keep "" if you might restore later)
+# If you also use b/c: ["a","b","c",""]
+
+DECK_TITLES = {"260112.": "2026. 01. 12. Workshop"}   # other decks show their prefix
+
+THUMB_MAX_W = 280
+
+# Warm-ups inside a running server (the page's, serve.py's) render with WARM_WORKERS processes
+# (1 = in their own thread, no pool), so they never take the cores the viewers need.
+WARM_WORKERS = 1
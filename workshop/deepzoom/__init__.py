@@ -0,0 +1,112 @@
+# ------------------------------------------------------------
+# Deep zoom: DZI tile pyramids of the slides and a pan/zoom viewer
+# - render_pyramid(): one slide -> <stem>.dzi + <stem>_files/<level>/<col>_<row>.webp
+#   (the Deep Zoom Image layout: level 0 is 1x1 px, each level doubles, the last one
+#   is full size; tiles are TILE_SIZE px plus OVERLAP px shared with each neighbour)
+# - build_many(): many slides on the thumbnail process pool (workshop.thumbs), for build_slides.py
+# - viewer(): pans and zooms one pyramid in the browser and loads only the tiles in view,
+#   at the level that matches the current zoom (a coarse level stays underneath while they load)
+# - the .dzi is written last, so a pyramid with a descriptor is complete
+# ------------------------------------------------------------
+import io
+import json
+import math
+import os
+import shutil
+
+import streamlit as st
+from PIL import Image
+
+from workshop.files import write_atomic
+from workshop.thumbs import VARIANT_QUALITY, decode_resized, encode_webp, flatten_white, pool_map
+
+TILE_SIZE    = 254   # + 2 x OVERLAP = 256 px tiles in the middle of a level
+OVERLAP      = 1
+TILE_FORMAT  = "webp"
+TILE_QUALITY = VARIANT_QUALITY
+
+_VIEWER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "viewer.html")
+
+_DZI = ('<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<Image xmlns="http://schemas.microsoft.com/deepzoom/2008" Format="{fmt}" Overlap="{overlap}" '
+        'TileSize="{tile_size}">\n  <Size Width="{width}" Height="{height}"/>\n</Image>\n')
+
+
+def max_level(w: int, h: int) -> int:
+    """Index of the full-size level (levels run 0 .. max_level)."""
+    return math.ceil(math.log2(max(w, h, 1)))
+
+
+def level_size(w: int, h: int, level: int) -> tuple[int, int]:
+    scale = 2 ** (max_level(w, h) - level)
+    return math.ceil(w / scale), math.ceil(h / scale)
+
+
+def tile_boxes(lw: int, lh: int, tile_size: int = TILE_SIZE, overlap: int = OVERLAP):
+    """(col, row, box) for every tile of a lw x lh level; box = (left, top, right, bottom) with overlap."""
+    for row in range(math.ceil(lh / tile_size)):
+        for col in range(math.ceil(lw / tile_size)):
+            left = col * tile_size - (overlap if col else 0)
+            top = row * tile_size - (overlap if row else 0)
+            yield col, row, (left, top, min(lw, (col + 1) * tile_size + overlap), min(lh, (row + 1) * tile_size + overlap))
+
+
+def render_pyramid(raw: bytes, out_dir: str, stem: str, tile_size: int = TILE_SIZE, overlap: int = OVERLAP,
+                   quality: int = TILE_QUALITY) -> dict:
+    """
+    Write the pyramid of one slide to out_dir/<stem>_files/ and out_dir/<stem>.dzi.
+    Each level is halved from the one above it. Returns the manifest entry (file names relative to out_dir).
+    """
+    with Image.open(io.BytesIO(raw)) as probe:
+        w, h = probe.size
+    im = flatten_white([decode_resized(raw, w)])[0]
+    top = max_level(w, h)
+
+    files = os.path.join(out_dir, f"{stem}_files")
+    tmp = f"{files}.tmp{os.getpid()}"
+    shutil.rmtree(tmp, ignore_errors=True)
+    count = total = 0
+    for level in range(top, -1, -1):
+        size = level_size(w, h, level)
+        if im.size != size:
+            im = im.resize(size, Image.LANCZOS)
+        os.makedirs(os.path.join(tmp, str(level)))
+        for col, row, box in tile_boxes(*size, tile_size, overlap):
+            data = encode_webp(im.crop(box), quality)
+            with open(os.path.join(tmp, str(level), f"{col}_{row}.{TILE_FORMAT}"), "wb") as f:
+                f.write(data)
+            count += 1
+            total += len(data)
+    shutil.rmtree(files, ignore_errors=True)
+    os.replace(tmp, files)
+
+    dzi = os.path.join(out_dir, f"{stem}.dzi")
+    write_atomic(dzi, _DZI.format(fmt=TILE_FORMAT, overlap=overlap, tile_size=tile_size, width=w, height=h).encode())
+    return {"file": f"{stem}.dzi", "tiles": f"{stem}_files", "width": w, "height": h, "tile_size": tile_size,
+            "overlap": overlap, "format": TILE_FORMAT, "max_level": top, "count": count, "bytes": total}
+
+
+def _render_from_source(source, name: str, out_dir: str, stem: str, tile_size: int, overlap: int,
+                        quality: int) -> dict:
+    # runs in a worker process: read the slide there, only the small entry comes back
+    return render_pyramid(source.read(name), out_dir, stem, tile_size, overlap, quality)
+
+
+def build_many(source, jobs: list[tuple], out_dir: str, workers: int = 0) -> list[dict]:
+    """render_pyramid() for each (name, stem) job, in the same order."""
+    os.makedirs(out_dir, exist_ok=True)
+    return pool_map(_render_from_source,
+                    [(source, name, out_dir, stem, TILE_SIZE, OVERLAP, TILE_QUALITY) for name, stem in jobs],
+                    workers)
+
+
+def viewer(zoom: dict, base_url: str, height: int, max_zoom: float = 4.0, label: str = ""):
+    """
+    Pan/zoom view of one pyramid (a manifest entry from render_pyramid()); tiles are loaded
+    from `base_url`/<tiles>/ (relative URLs resolve against the app). `max_zoom` = screen px per image px.
+    """
+    config = dict(zoom, base=f"{base_url}/{zoom['tiles']}", max_zoom=max_zoom, label=label)
+    with open(_VIEWER, encoding="utf-8") as f:
+        doc = f.read()
+    doc = doc.replace("__CONFIG__", json.dumps(config).replace("</", "<\\/")).replace("__HEIGHT__", str(int(height)))
+    return st.iframe(doc, height=height)
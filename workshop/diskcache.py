@@ -0,0 +1,107 @@
+# ------------------------------------------------------------
+# Disk cache for derived images (thumbnails, resized variants...)
+# - entries are keyed by the source slide's content hash + render parameters
+# - writes are atomic (workshop.files.write_atomic), so readers never see half a file
+# - total size is capped; the least recently used entries are evicted first
+# ------------------------------------------------------------
+import hashlib
+import os
+import threading
+
+from workshop import metrics
+from workshop.files import write_atomic
+
+
+def derivative_key(content_hash: str, **params) -> str:
+    """Stable key for `content_hash` rendered with `params` (order-independent)."""
+    spec = "&".join(f"{k}={params[k]}" for k in sorted(params))
+    return hashlib.sha256(f"{content_hash}?{spec}".encode()).hexdigest()
+
+
+class DiskCache:
+    """
+    Files under `root`, one per key, at most `max_bytes` in total.
+    Recency is the file mtime: get() touches the entry, eviction removes the oldest.
+    The constructor raises OSError if `root` can't be created; a failed put() is counted and skipped.
+    """
+
+    def __init__(self, root: str, max_bytes: int):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+        self._size = self._scan_size()
+
+    def _path(self, key: str) -> str:
+        # two-level fan-out keeps directories small for big decks
+        return os.path.join(self.root, key[:2], key)
+
+    def _scan_size(self) -> int:
+        return sum(size for _, _, size in self._entries())
+
+    def _entries(self):
+        """[(mtime_ns, path, size), ...] for every cached file."""
+        out = []
+        for dirpath, _, files in os.walk(self.root):
+            for f in files:
+                if f.startswith(".tmp"):
+                    continue
+                p = os.path.join(dirpath, f)
+                try:
+                    st = os.stat(p)
+                except OSError:
+                    continue
+                out.append((st.st_mtime_ns, p, st.st_size))
+        return out
+
+    def get(self, key: str):
+        p = self._path(key)
+        try:
+            with open(p, "rb") as f:
+                data = f.read()
+        except OSError:
+            metrics.count("disk_cache.miss")
+            return None
+        metrics.count("disk_cache.hit")
+        try:
+            os.utime(p)  # mark as recently used
+        except OSError:
+            pass
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        if len(data) > self.max_bytes:
+            return
+        p = self._path(key)
+        try:
+            old = os.path.getsize(p)
+        except OSError:
+            old = 0
+        try:
+            write_atomic(p, data)
+        except OSError:
+            # unwritable folder, disk full...: only an optimisation, the caller has its data
+            metrics.count("disk_cache.write_error")
+            return
+        with self._lock:
+            self._size += len(data) - old
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        """Drop least recently used entries until the cache is ~10% under budget."""
+        entries = sorted(self._entries())
+        total = sum(size for _, _, size in entries)
+        target = int(self.max_bytes * 0.9)
+        for _, p, size in entries:
+            if total <= target:
+                break
+            try:
+                os.unlink(p)
+                total -= size
+            except OSError:
+                pass
+        self._size = total
+
+    def size(self) -> int:
+        return self._size
@@ -0,0 +1,106 @@
+# ------------------------------------------------------------
+# Lazy third-party embeds
+# - lazy_html() / lazy_iframe() draw a light placeholder of the final height
+#   (no layout shift) and fetch the third-party script or iframe only when the
+#   placeholder comes near the viewport ("visible") or is clicked ("click")
+# - content in an inactive st.tabs tab is not visible, so it waits until the tab is opened
+# - iframes also get native loading="lazy"
+# - lazy_html() mounts its HTML into <div id="embed">; <script> tags are run in
+#   order (external ones after the previous one has loaded), as in a static page
+# - rendered with st.iframe (components.html is deprecated)
+# ------------------------------------------------------------
+import html
+import json
+
+import streamlit as st
+
+ROOT_MARGIN = "200px"   # start loading this far before the placeholder scrolls into view
+
+_DOCUMENT = """<!doctype html>
+<html>
+<head>
+<meta charset="utf-8" />
+<style>
+  html, body { margin: 0; font-family: "Source Sans Pro", sans-serif; overflow: __OVERFLOW__; }
+  #placeholder { box-sizing: border-box; height: __HEIGHT__px; display: flex; flex-direction: column;
+    align-items: center; justify-content: center; gap: 10px; border: 1px dashed #d0d3da;
+    border-radius: 10px; background: #f8f9fb; color: #808495; font-size: 15px; }
+  #placeholder button { border: 1px solid #ccc; background: #fff; border-radius: 6px; padding: 6px 14px;
+    cursor: pointer; font-size: 15px; }
+  #placeholder button:hover { border-color: #ff4b4b; color: #ff4b4b; }
+  #embed iframe { display: block; border: 0; }
+</style>
+</head>
+<body>
+<div id="placeholder"><div>__LABEL__</div><button id="load">▶ Load</button></div>
+<div id="embed"></div>
+<script>
+const PAYLOAD = __PAYLOAD__;
+const TRIGGER = __TRIGGER__;
+let loaded = false;
+
+async function mount(markup) {
+  // innerHTML does not run scripts: re-create them one by one, in document order
+  const box = document.getElementById("embed");
+  const tpl = document.createElement("template");
+  tpl.innerHTML = markup;
+  const scripts = Array.from(tpl.content.querySelectorAll("script"));
+  scripts.forEach((s) => s.remove());
+  box.appendChild(tpl.content);
+  for (const old of scripts) {
+    const s = document.createElement("script");
+    for (const a of old.attributes) s.setAttribute(a.name, a.value);
+    if (old.src) {
+      await new Promise((done) => { s.onload = s.onerror = done; box.appendChild(s); });
+    } else {
+      s.textContent = old.textContent;
+      box.appendChild(s);
+    }
+  }
+}
+
+function load() {
+  if (loaded) return;
+  loaded = true;
+  document.getElementById("placeholder").remove();
+  mount(PAYLOAD);
+}
+
+document.getElementById("load").onclick = load;
+if (TRIGGER === "visible" && "IntersectionObserver" in window) {
+  // root null = the top-level viewport, so this also sees the Streamlit page scrolling and hidden tabs
+  const io = new IntersectionObserver((entries) => {
+    if (entries.some((e) => e.isIntersecting)) { io.disconnect(); load(); }
+  }, { rootMargin: "__ROOT_MARGIN__" });
+  io.observe(document.getElementById("placeholder"));
+}
+</script>
+</body>
+</html>
+"""
+
+
+def _document(payload: str, height: int, label: str, trigger: str, scrolling: bool = False) -> str:
+    if trigger not in ("visible", "click"):
+        raise ValueError(f"trigger must be 'visible' or 'click', not {trigger!r}")
+    return (_DOCUMENT
+            .replace("__HEIGHT__", str(int(height)))
+            .replace("__OVERFLOW__", "auto" if scrolling else "hidden")
+            .replace("__LABEL__", html.escape(label))
+            .replace("__ROOT_MARGIN__", ROOT_MARGIN)
+            .replace("__TRIGGER__", json.dumps(trigger))
+            .replace("__PAYLOAD__", json.dumps(payload).replace("</", "<\\/")))
+
+
+def lazy_html(markup: str, height: int, label: str = "", trigger: str = "visible", scrolling: bool = False):
+    """Embed `markup` (mounted into #embed) once it is visible or clicked; `height` in px."""
+    return st.iframe(_document(markup, height, label, trigger, scrolling), height=height)
+
+
+def lazy_iframe(src: str, height: int, label: str = "", trigger: str = "visible", allow: str = "",
+                title: str = ""):
+    """A full-width iframe of `src` that loads only when visible (or clicked)."""
+    attrs = f' allow="{html.escape(allow)}"' if allow else ""
+    markup = (f'<iframe src="{html.escape(src)}" title="{html.escape(title or label)}" width="100%" '
+              f'height="{int(height)}" loading="lazy"{attrs}></iframe>')
+    return st.iframe(_document(markup, height, label, trigger), height=height)
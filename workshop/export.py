@@ -0,0 +1,369 @@
+# ------------------------------------------------------------
+# Static site export
+# - turns the home page, the slide player and the static content pages into
+#   plain HTML files that any file server can host: no Streamlit session,
+#   websocket or rerun per viewer
+# - content pages are run once with streamlit.testing (AppTest) and their element
+#   tree is written out as HTML; markdown goes through markdown-it-py (an
+#   export-only dependency), image widths come from the page source
+# - the slide player is the presenter's player.js fed with the build_slides.py
+#   variants (srcset), thumbnails and placeholders; navigation is client side, #<n> opens slide n;
+#   one player page per deck, linked from each other
+# - other files go to assets/ under content-hashed names, and _headers marks
+#   assets/ and slides/ immutable (Netlify / Cloudflare Pages format)
+# ------------------------------------------------------------
+import ast
+import hashlib
+import html
+import json
+import os
+import re
+import shutil
+import textwrap
+from dataclasses import dataclass
+
+from markdown_it import MarkdownIt
+
+from workshop import assets
+from workshop.files import write_atomic
+from workshop.manifest import deck_slug
+from workshop.presenter import _FRONTEND
+from workshop.thumbs import lqip_background
+
+ASSET_DIR = "assets"
+SLIDE_DIR = "slides"
+HEADERS   = f"/{ASSET_DIR}/*\n  Cache-Control: {assets.IMMUTABLE}\n/{SLIDE_DIR}/*\n  Cache-Control: {assets.IMMUTABLE}\n"
+
+SITE_CSS = """\
+body { margin: 0; font-family: "Source Sans Pro", system-ui, sans-serif; color: #31333f; line-height: 1.6; }
+nav { display: flex; flex-wrap: wrap; gap: 4px 18px; padding: 10px 24px; border-bottom: 1px solid #e6e6e6; background: #f0f2f6; }
+nav a { color: #31333f; text-decoration: none; }
+nav a.current { font-weight: 700; color: #ff4b4b; }
+main { max-width: 736px; margin: 0 auto; padding: 24px 16px 48px; }
+main.wide { max-width: none; padding: 24px 40px 48px; }
+a { color: #0068c9; }
+pre { background: #f0f2f6; border-radius: 6px; padding: 12px 16px; overflow-x: auto; }
+code { font-size: 0.9em; background: #f0f2f6; border-radius: 4px; padding: 1px 4px; }
+pre code { padding: 0; }
+hr { border: 0; border-top: 1px solid #e6e6e6; margin: 24px 0; }
+.caption { color: #808495; font-size: 14px; }
+.caption p { margin: 0 0 8px; }
+figure { margin: 0 0 16px; }
+figure img { max-width: 100%; height: auto; }
+figcaption { color: #808495; font-size: 14px; }
+.columns { display: flex; flex-wrap: wrap; gap: 16px; }
+.columns > div { flex: 1 1 0; min-width: 200px; }
+.tabs { display: flex; flex-wrap: wrap; margin: 8px 0 16px; }
+.tabs > input { position: absolute; opacity: 0; pointer-events: none; }
+.tabs > label { order: 0; padding: 8px 14px; cursor: pointer; border-bottom: 2px solid #e6e6e6; }
+.tabs > label:hover { color: #ff4b4b; }
+.tabs > .panel { order: 1; width: 100%; display: none; }
+.tabs > input:checked + label { color: #ff4b4b; border-bottom-color: #ff4b4b; }
+.tabs > input:checked + label + .panel { display: block; }
+.tabs > input:focus-visible + label { outline: 2px solid #ff4b4b; }
+#thumbs { display: flex; flex-wrap: wrap; gap: 10px; justify-content: center; margin-top: 24px; }
+#thumbs a { color: #808495; font-size: 13px; text-align: center; text-decoration: none; }
+#thumbs img { display: block; width: 150px; height: auto; border: 2px solid #e6e6e6; border-radius: 4px; }
+#thumbs a.current img { border-color: #ff4b4b; }
+"""
+
+# player markup shared with the presenter component
+_PLAYER_MARKUP = re.compile(r"<!-- player -->\n(.*?)<!-- /player -->", re.S)
+
+
+@dataclass
+class Page:
+    source: str      # script path, or "slides" for the slide player
+    file: str        # output file name, e.g. "index.html"
+    label: str       # navigation label
+
+
+# ---------- Markdown ----------
+def _markdown() -> MarkdownIt:
+    # CommonMark plus bare URLs and ~~strikethrough~~, as st.markdown; raw HTML is shown as text
+    md = MarkdownIt("commonmark", {"html": False, "linkify": True}).enable(["linkify", "strikethrough"])
+
+    def external_link_open(self, tokens, idx, options, env):
+        # links to other sites open in a new tab, as in the app
+        if tokens[idx].attrGet("href").startswith(("http://", "https://")):
+            tokens[idx].attrSet("target", "_blank")
+            tokens[idx].attrSet("rel", "noopener")
+        return self.renderToken(tokens, idx, options, env)
+
+    md.add_render_rule("link_open", external_link_open)
+    return md
+
+
+_MD = _markdown()
+
+
+def md_to_html(text: str) -> str:
+    """Markdown of a page element as HTML."""
+    return _MD.render(textwrap.dedent(text).strip("\n")).rstrip("\n")
+
+
+def inline(text: str) -> str:
+    """Markdown of a one-line label (title, tab, expander) as HTML, without the paragraph."""
+    return _MD.renderInline(text)
+
+
+# ---------- Site files ----------
+class _Site:
+    """Output folder; files are added under content-hashed names."""
+
+    def __init__(self, root: str):
+        self.root = root
+        self._copied = {}
+
+    def write(self, rel: str, data: bytes) -> None:
+        write_atomic(os.path.join(self.root, rel), data)
+
+    def add_bytes(self, data: bytes, stem: str, ext: str) -> str:
+        name = f"{stem}.{hashlib.sha256(data).hexdigest()[:assets.HASH_CHARS]}{ext}"
+        self.write(f"{ASSET_DIR}/{name}", data)
+        return f"{ASSET_DIR}/{name}"
+
+    def add_file(self, path: str, rel_dir: str = ASSET_DIR) -> str:
+        """Relative URL of a copy of `path`; names that are already content-hashed are kept."""
+        if path not in self._copied:
+            name = os.path.basename(path)
+            if rel_dir == ASSET_DIR and not assets.HASHED_NAME.search(name):
+                name = assets.hashed_name(path)
+            rel = f"{rel_dir}/{name}"
+            os.makedirs(os.path.dirname(os.path.join(self.root, rel)), exist_ok=True)
+            shutil.copyfile(path, os.path.join(self.root, rel))
+            self._copied[path] = rel
+        return self._copied[path]
+
+    def add_url(self, url: str) -> str:
+        """An image URL of the running app as a URL inside the site (remote URLs are left alone)."""
+        local = url.lstrip("/")
+        if local.startswith("app/static/"):
+            return self.add_file(os.path.join(assets.APP_DIR, "static", local[len("app/static/"):]))
+        if local.startswith("media/") or re.match(r"^[a-z][a-z0-9+.-]*:", url):
+            return url
+        return self.add_file(os.path.join(assets.APP_DIR, local))
+
+
+def _shell(title: str, body: str, pages: list[Page], current: str, css_url: str,
+           wide: bool = False, head: str = "", app_url: str = "") -> str:
+    links = [f'<a href="{p.file}"{" class=current" if p.file == current else ""}>{html.escape(p.label)}</a>'
+             for p in pages]
+    if app_url:
+        links.append(f'<a href="{html.escape(app_url)}">Live app ↗</a>')
+    return (
+        "<!doctype html>\n<html>\n<head>\n<meta charset=\"utf-8\" />\n"
+        "<meta name=\"viewport\" content=\"width=device-width, initial-scale=1\" />\n"
+        f"<title>{html.escape(title)}</title>\n<link rel=\"stylesheet\" href=\"{css_url}\" />\n{head}"
+        f"</head>\n<body>\n<nav>{' '.join(links)}</nav>\n"
+        f"<main{' class=wide' if wide else ''}>\n{body}\n</main>\n</body>\n</html>\n"
+    )
+
+
+# ---------- Content pages ----------
+def image_widths(script: str) -> list:
+    """The literal `width=` of each `.image(...)` call in `script`, in source order (None if not an int)."""
+    with open(script, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    calls = sorted((n for n in ast.walk(tree) if isinstance(n, ast.Call) and isinstance(n.func, ast.Attribute)
+                    and n.func.attr == "image"), key=lambda n: (n.lineno, n.col_offset))
+    widths = []
+    for call in calls:
+        w = next((k.value for k in call.keywords if k.arg == "width"), None)
+        ok = isinstance(w, ast.Constant) and isinstance(w.value, int) and not isinstance(w.value, bool)
+        widths.append(w.value if ok else None)
+    return widths
+
+
+def run_page(script: str, timeout: float = 30):
+    """(main block of one run of `script`, {image url: pixel width}), through AppTest's public API."""
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(os.path.abspath(script), default_timeout=timeout).run()
+    if at.exception:
+        raise RuntimeError(f"{script}: {at.exception[0].message}")
+    # the element tree has no image widths: match the page's image calls to its image elements
+    images, calls = at.get("image"), image_widths(script)
+    widths = {}
+    if len(images) == len(calls):   # else some call ran in a loop, a branch or a helper: no widths
+        for el, w in zip(images, calls):
+            for url in el.value:
+                widths[url] = w
+    return at.main, widths
+
+
+def _elements_html(node, site: _Site, widths: dict, skipped: set, ids: list) -> list[str]:
+    out = []
+    for child in node.children.values():
+        t = child.type
+        if t == "markdown":
+            out.append(md_to_html(child.value))
+        elif t == "caption":
+            out.append(f'<div class="caption">{md_to_html(child.value)}</div>')
+        elif t in ("title", "header", "subheader"):
+            level = {"title": 1, "header": 2, "subheader": 3}[t]
+            out.append(f"<h{level}>{inline(child.value)}</h{level}>")
+        elif t == "divider":
+            out.append("<hr>")
+        elif t == "code":
+            lang = child.language
+            cls = f' class="language-{html.escape(lang)}"' if lang else ""
+            out.append(f"<pre><code{cls}>{html.escape(child.value)}</code></pre>")
+        elif t == "image":
+            for url, caption in zip(child.value, child.captions):
+                w = widths.get(url)
+                size = f' width="{w}"' if w else ""
+                cap = f"<figcaption>{html.escape(caption)}</figcaption>" if caption else ""
+                out.append(f'<figure><img src="{html.escape(site.add_url(url))}"{size} alt="{html.escape(caption)}"'
+                           f' loading="lazy" decoding="async" />{cap}</figure>')
+        elif t == "tab_container":
+            group = f"tabs{len(ids)}"
+            ids.append(group)
+            parts = []
+            for k, tab in enumerate(child.children.values()):
+                tab_id = f"{group}-{k}"
+                parts.append(f'<input type="radio" name="{group}" id="{tab_id}"{" checked" if k == 0 else ""} />'
+                             f'<label for="{tab_id}">{inline(tab.label)}</label>'
+                             f'<div class="panel">\n' + "\n".join(_elements_html(tab, site, widths, skipped, ids))
+                             + "\n</div>")
+            out.append('<div class="tabs">\n' + "\n".join(parts) + "\n</div>")
+        elif t == "horizontal":
+            cols = ["<div>\n" + "\n".join(_elements_html(c, site, widths, skipped, ids)) + "\n</div>"
+                    for c in child.children.values()]
+            out.append('<div class="columns">\n' + "\n".join(cols) + "\n</div>")
+        elif t == "expandable":
+            out.append(f"<details><summary>{inline(child.label)}</summary>\n"
+                       + "\n".join(_elements_html(child, site, widths, skipped, ids)) + "\n</details>")
+        elif t in ("vertical", "column", "container"):
+            out.extend(_elements_html(child, site, widths, skipped, ids))
+        else:
+            skipped.add(t)
+    return out
+
+
+def page_html(script: str, site: _Site) -> tuple[str, set]:
+    """Body HTML of a content page and the element types it could not export."""
+    main, widths = run_page(script)
+    skipped = set()
+    body = "\n".join(_elements_html(main, site, widths, skipped, []))
+    return body, skipped
+
+
+# ---------- Slide player ----------
+def _player_slides(m: dict, screen_w: int) -> list[dict]:
+    slides = []
+    for s in m["slides"]:
+        variants = s["variants"]
+        src = next((v for v in variants if v["width"] >= screen_w), variants[-1])
+        slides.append({
+            "src": f'{SLIDE_DIR}/{src["file"]}',
+            "srcset": [[f'{SLIDE_DIR}/{v["file"]}', v["width"]] for v in variants],
+            "width": s["width"],
+            "height": s["height"],
+        })
+        if "lqip" in s:
+            slides[-1]["lqip"] = s["lqip"]
+    return slides
+
+
+def _lqip_attr(s: dict) -> str:
+    return f' style="background: {lqip_background(s["lqip"])}"' if "lqip" in s else ""
+
+
+def slides_html(m: dict, build_dir: str, site: _Site, title: str, vh_percent: int = 80,
+                width_px: int = 1000, preload_ahead: int = 2, screen_w: int = 1920,
+                deck_links: str = "") -> tuple[str, str]:
+    """
+    (head, body) of the slide player page for manifest `m`; copies its derivatives into the site
+    (content-hashed names, so every deck shares slides/). `deck_links` goes above the title.
+    """
+    for s in m["slides"]:
+        for item in [s["thumb"], *s["variants"]]:
+            site.add_file(os.path.join(build_dir, item["file"]), f'{SLIDE_DIR}/{os.path.dirname(item["file"])}')
+
+    with open(os.path.join(_FRONTEND, "index.html"), encoding="utf-8") as f:
+        markup = _PLAYER_MARKUP.search(f.read())[1]
+    player_js = site.add_file(os.path.join(_FRONTEND, "player.js"))
+    player_css = site.add_file(os.path.join(_FRONTEND, "player.css"))
+
+    thumbs = "\n".join(
+        f'<a href="#{i + 1}"><img src="{SLIDE_DIR}/{s["thumb"]["file"]}" width="{s["thumb"]["width"]}" '
+        f'height="{s["thumb"]["height"]}" alt="Slide {i + 1}" loading="lazy" decoding="async"'
+        f'{_lqip_attr(s)} />{i + 1}</a>'
+        for i, s in enumerate(m["slides"])
+    )
+    deck = {"slides": _player_slides(m, screen_w), "vh": vh_percent, "width_px": width_px, "ahead": preload_ahead}
+    deck_json = json.dumps(deck).replace("</", "<\\/")
+    script = f"""<script src="{player_js}"></script>
+<script>
+const DECK = {deck_json};
+const thumbs = document.querySelectorAll("#thumbs a");
+function mark(i) {{ thumbs.forEach((a, j) => a.classList.toggle("current", j === i)); }}
+const player = createPlayer({{
+  base: location.href,
+  onMove: (i) => {{ history.replaceState(null, "", "#" + (i + 1)); mark(i); }},
+}});
+player.setSlides(DECK.slides);
+player.setLayout(true, DECK.vh, DECK.width_px);
+player.setPreload(DECK.ahead);
+function fromHash() {{
+  const n = parseInt(location.hash.slice(1), 10);
+  return n >= 1 && n <= DECK.slides.length ? n - 1 : 0;
+}}
+function follow() {{ player.show(fromHash(), false); mark(player.index); }}
+window.addEventListener("hashchange", follow);
+follow();
+</script>"""
+    body = f'{deck_links}<h3>{html.escape(title)}</h3>\n{markup}<div id="thumbs">\n{thumbs}\n</div>\n{script}'
+    return f'<link rel="stylesheet" href="{player_css}" />\n', body
+
+
+# ---------- Whole site ----------
+def _deck_files(page: Page, decks: list[tuple]) -> list[str]:
+    """Output file per deck: the slides page for the first one, <page>-<deck>.html for the others."""
+    stem, ext = os.path.splitext(page.file)
+    return [page.file] + [f"{stem}-{deck_slug(m['deck']['prefix'])}{ext}" for m, _, _ in decks[1:]]
+
+
+def export(out_dir: str, pages: list[Page], decks: list[tuple], site_title: str, app_url: str = "",
+           log=print) -> dict:
+    """
+    Write the static site for `pages` to `out_dir` (replaced as a whole) and return
+    {file: element types skipped}. `decks` is [(manifest, its build folder, title), ...] of current
+    build_slides.py builds; the slides page shows the first one and links a page per other deck.
+    """
+    if os.path.isdir(out_dir) and os.listdir(out_dir) and not os.path.isfile(os.path.join(out_dir, "_headers")):
+        raise ValueError(f"{out_dir} is not empty and not an earlier export; refusing to replace it")
+    tmp = out_dir.rstrip("/\\") + ".tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    site = _Site(tmp)
+    css_url = site.add_bytes(SITE_CSS.encode(), "site", ".css")
+    report = {}
+    for page in pages:
+        title = page.label if page.file == "index.html" else f"{page.label} · {site_title}"
+        if page.source == "slides":
+            files = _deck_files(page, decks)
+            for file, (m, build_dir, deck_title) in zip(files, decks):
+                links = "" if len(decks) < 2 else '<p class="decks">' + " · ".join(
+                    f"<strong>{html.escape(t)}</strong>" if f == file else f'<a href="{f}">{html.escape(t)}</a>'
+                    for f, (_, _, t) in zip(files, decks)) + "</p>\n"
+                head, body = slides_html(m, build_dir, site, deck_title, deck_links=links)
+                doc = _shell(title, body, pages, page.file, css_url, wide=True, head=head, app_url=app_url)
+                site.write(file, doc.encode())
+                report[file] = set()
+                log(f"{file:20s} <- {page.source}: {m['deck']['prefix']}")
+            continue
+        body, skipped = page_html(page.source, site)
+        doc = _shell(title, body, pages, page.file, css_url, app_url=app_url)
+        site.write(page.file, doc.encode())
+        report[page.file] = skipped
+        log(f"{page.file:20s} <- {page.source}" + (f"  (skipped: {', '.join(sorted(skipped))})" if skipped else ""))
+    site.write("_headers", HEADERS.encode())
+
+    old = out_dir.rstrip("/\\") + ".old"
+    shutil.rmtree(old, ignore_errors=True)
+    if os.path.exists(out_dir):
+        os.replace(out_dir, old)
+    os.replace(tmp, out_dir)
+    shutil.rmtree(old, ignore_errors=True)
+    return report
@@ -0,0 +1,38 @@
+# ------------------------------------------------------------
+# Atomic file writes
+# - write_atomic(): bytes -> file, copy_atomic(): file -> file
+# - both write a temp file next to the target and os.replace() it, so readers
+#   (other sessions, the static file server) never see half a file
+# ------------------------------------------------------------
+import os
+import shutil
+import tempfile
+
+
+def _replace_with(path: str, fill) -> None:
+    d = os.path.dirname(path) or "."
+    os.makedirs(d, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=".tmp", dir=d)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            fill(f)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def write_atomic(path: str, data: bytes) -> None:
+    """Write `data` to `path`, creating its folder; raises OSError (and leaves no temp file) on failure."""
+    _replace_with(path, lambda f: f.write(data))
+
+
+def copy_atomic(src: str, path: str) -> None:
+    """Copy the file `src` to `path` like write_atomic()."""
+    def fill(f):
+        with open(src, "rb") as s:
+            shutil.copyfileobj(s, f)
+    _replace_with(path, fill)
@@ -0,0 +1,293 @@
+# ------------------------------------------------------------
+# Slide manifest
+# - build():      scan a slides folder once, pre-render thumbnails + display variants
+#                 (and a deep-zoom tile pyramid per slide, workshop.deepzoom) and an inline
+#                 placeholder (LQIP) per slide,
+#                 write them with content-hashed names plus manifest.json;
+#                 incremental: only added/changed slides are hashed and rendered
+# - build_all():  build() for every deck of the folder's catalog (workshop.catalog), one
+#                 folder per deck under the build root (deck_dir()); folders of decks that
+#                 are gone are removed
+# - load():       read a manifest (None if missing/unreadable)
+# - is_current(): does the manifest still describe the slides folder?
+# - current_decks(): {deck prefix: manifest} of the builds that are still current
+# ------------------------------------------------------------
+import hashlib
+import io
+import json
+import os
+import re
+import shutil
+import time
+
+from PIL import Image
+
+from workshop import catalog, deepzoom
+from workshop.files import write_atomic
+from workshop.sources import LocalSource, SlideSource, candidates, discover
+from workshop.thumbs import (LQIP_QUALITY, LQIP_WIDTH, REDUCING_GAP, THUMB_QUALITY, VARIANT_QUALITY,
+                             VARIANT_WIDTHS, WEBP_METHOD, make_lqips, render_many)
+
+MANIFEST_NAME    = "manifest.json"
+MANIFEST_VERSION = 1
+
+
+def deck_spec(prefix: str, ext: str, start_i: int, end_i: int, suffix_order: list[str]) -> dict:
+    """The discovery settings a manifest was built with (the page only uses a manifest with the same spec)."""
+    return {"prefix": prefix, "ext": ext, "start": start_i, "end": end_i, "suffix_order": list(suffix_order)}
+
+
+def deck_slug(prefix: str) -> str:
+    """Folder name of a deck's build, e.g. "260112." -> "260112"."""
+    return re.sub(r"[^0-9A-Za-z_-]+", "_", prefix).strip("_-") or "deck"
+
+
+def deck_dir(build_root: str, prefix: str) -> str:
+    return os.path.join(build_root, deck_slug(prefix))
+
+
+def _scaled_h(w: int, h: int, max_w: int) -> int:
+    # same rounding as render_webp()
+    return int(h * (max_w / w)) if w > max_w else h
+
+
+
+def _render_params() -> dict:
+    """Everything besides content hash + width that shapes a derivative file."""
+    return {"format": "webp", "thumb_quality": THUMB_QUALITY, "variant_quality": VARIANT_QUALITY,
+            "method": WEBP_METHOD, "reducing_gap": REDUCING_GAP}
+
+
+def _zoom_params() -> dict:
+    """Everything that shapes a tile pyramid."""
+    return {"tile_size": deepzoom.TILE_SIZE, "overlap": deepzoom.OVERLAP, "format": deepzoom.TILE_FORMAT,
+            "quality": deepzoom.TILE_QUALITY}
+
+
+def build(slides_dir: str, out_dir: str, spec: dict, thumb_w: int, widths: list[int] = VARIANT_WIDTHS,
+          workers: int = 0, log=print, force: bool = False, zoom: bool = True) -> dict:
+    """
+    Render the derivatives for the deck in `slides_dir` into `out_dir` and write the manifest.
+    Incremental: the previous manifest is the ledger (name, size, mtime, sha256 per slide), so
+    only new or modified files are read and hashed, and since derivative files are named by
+    content hash, only slides with new content are rendered. `force` re-renders everything.
+    `zoom` adds a deep-zoom pyramid per slide (zoom/<hash>.dzi + zoom/<hash>_files/).
+    """
+    source = LocalSource(slides_dir)
+    cands = candidates(spec["prefix"], spec["ext"], spec["start"], spec["end"], spec["suffix_order"])
+    where = {name: (i, suf) for i, tries in cands for name, suf in zip(tries, spec["suffix_order"])}
+    names = discover(source, spec["prefix"], spec["ext"], spec["start"], spec["end"], spec["suffix_order"])
+
+    prev = None if force else load(os.path.join(out_dir, MANIFEST_NAME))
+    render = _render_params()
+    reuse = prev is not None and prev.get("render") == render
+    zoom_params = _zoom_params() if zoom else None
+    lqip_params = {"width": LQIP_WIDTH, "quality": LQIP_QUALITY}
+    old_lqip = {s["sha256"]: s["lqip"] for s in prev["slides"] if "lqip" in s} \
+        if prev and prev.get("lqip") == lqip_params else {}
+    old_zoom = {s["sha256"]: s["zoom"] for s in prev["slides"] if "zoom" in s} \
+        if prev and zoom and prev.get("zoom") == zoom_params else {}
+    ledger = {s["name"]: s for s in prev["slides"]} if prev else {}
+    old_shas = {s["sha256"] for s in ledger.values()}
+    changes = {"added": [], "changed": [], "renamed": [], "deleted": [], "unchanged": 0}
+
+    slides = []
+    jobs = []
+    zoom_jobs = []
+    lqip_jobs = []
+    reused = 0
+    for order, name in enumerate(names):
+        stat = os.stat(os.path.join(slides_dir, name))
+        old = ledger.get(name)
+        if old and old.get("mtime_ns") == stat.st_mtime_ns and old["bytes"] == stat.st_size:
+            sha, w, h = old["sha256"], old["width"], old["height"]   # untouched file: not even read
+        else:
+            raw = source.read(name)
+            sha = hashlib.sha256(raw).hexdigest()
+            with Image.open(io.BytesIO(raw)) as im:
+                w, h = im.size
+        if old and old["sha256"] == sha:
+            changes["unchanged"] += 1
+        elif old:
+            changes["changed"].append(name)
+        elif sha in old_shas:
+            changes["renamed"].append(name)
+        else:
+            changes["added"].append(name)
+        stem = sha[:16]
+        number, suffix = where[name]
+
+        thumb = {"file": f"thumbs/{stem}.w{thumb_w}.webp", "width": min(w, thumb_w), "height": _scaled_h(w, h, thumb_w)}
+        variants = [
+            {"file": f"variants/{stem}.w{vw}.webp", "width": vw, "height": _scaled_h(w, h, vw)}
+            for vw in sorted({min(vw, w) for vw in widths})
+        ]
+        for item, quality in [(thumb, THUMB_QUALITY)] + [(v, VARIANT_QUALITY) for v in variants]:
+            path = os.path.join(out_dir, item["file"])
+            if reuse and os.path.isfile(path):
+                item["bytes"] = os.path.getsize(path)
+                reused += 1
+            else:
+                jobs.append((name, item["width"], quality, item))
+
+        slides.append({
+            "order": order,
+            "number": number,
+            "suffix": suffix,
+            "name": name,
+            "width": w,
+            "height": h,
+            "bytes": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": sha,
+            "thumb": thumb,
+            "variants": variants,
+        })
+        if sha in old_lqip:
+            slides[-1]["lqip"] = old_lqip[sha]
+        else:
+            lqip_jobs.append((name, slides[-1]))
+        if zoom:
+            pyramid = old_zoom.get(sha)
+            if pyramid and os.path.isfile(os.path.join(out_dir, pyramid["file"])):
+                slides[-1]["zoom"] = pyramid
+                reused += 1
+            else:
+                zoom_jobs.append((name, stem, slides[-1]))
+
+    new_shas = {s["sha256"] for s in slides}
+    changes["deleted"] = [n for n, s in ledger.items() if n not in set(names) and s["sha256"] not in new_shas]
+
+    if jobs:
+        log(f"rendering {len(jobs)} images ({reused} reused) ...")
+        for (_, _, _, item), data in zip(jobs, render_many(source, [job[:3] for job in jobs], workers)):
+            write_atomic(os.path.join(out_dir, item["file"]), data)
+            item["bytes"] = len(data)
+    if lqip_jobs:
+        for (_, slide), lqip in zip(lqip_jobs, make_lqips(source, [job[0] for job in lqip_jobs], workers)):
+            slide["lqip"] = lqip
+    if zoom_jobs:
+        log(f"building {len(zoom_jobs)} deep-zoom pyramids ...")
+        pyramids = deepzoom.build_many(source, [job[:2] for job in zoom_jobs], os.path.join(out_dir, "zoom"), workers)
+        for (_, _, slide), pyramid in zip(zoom_jobs, pyramids):
+            slide["zoom"] = dict(pyramid, file=f"zoom/{pyramid['file']}", tiles=f"zoom/{pyramid['tiles']}")
+
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "built_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "deck": spec,
+        "thumb_max_w": thumb_w,
+        "variant_widths": list(widths),
+        "render": render,
+        "zoom": zoom_params,
+        "lqip": lqip_params,
+        "slides": slides,
+    }
+    write_atomic(os.path.join(out_dir, MANIFEST_NAME), json.dumps(manifest, indent=1).encode())
+
+    # files from earlier builds that nothing refers to any more (deleted or changed slides)
+    keep = {item["file"] for s in slides for item in [s["thumb"], *s["variants"]]}
+    removed = 0
+    for sub in ("thumbs", "variants"):
+        d = os.path.join(out_dir, sub)
+        if os.path.isdir(d):
+            for f in os.listdir(d):
+                if f"{sub}/{f}" not in keep:
+                    os.unlink(os.path.join(d, f))
+                    removed += 1
+    keep_zoom = {p for s in slides if "zoom" in s for p in (s["zoom"]["file"], s["zoom"]["tiles"])}
+    d = os.path.join(out_dir, "zoom")
+    if os.path.isdir(d):
+        for f in os.listdir(d):
+            if f"zoom/{f}" not in keep_zoom:
+                path = os.path.join(d, f)
+                if os.path.isdir(path):
+                    shutil.rmtree(path)
+                else:
+                    os.unlink(path)
+                removed += 1
+
+    manifest["changes"] = dict(changes, rendered=len(jobs), zoomed=len(zoom_jobs), reused=reused, removed=removed)
+    return manifest
+
+
+def build_all(slides_dir: str, build_root: str, ext: str, suffix_order: list[str], thumb_w: int,
+              widths: list[int] = VARIANT_WIDTHS, workers: int = 0, log=print, force: bool = False,
+              zoom: bool = True) -> dict:
+    """
+    build() every deck of the catalog of `slides_dir` into deck_dir(build_root, prefix), each over
+    the range of slide numbers it has. Returns {prefix: manifest}; builds of decks that are no
+    longer in the folder are removed.
+    """
+    cat = catalog.build(LocalSource(slides_dir), ext, suffix_order)
+    out = {}
+    for deck in cat["decks"]:
+        spec = deck_spec(deck["id"], ext, deck["numbers"][0], deck["numbers"][-1], suffix_order)
+        log(f"{deck['id']}: {len(deck['slides'])} slides")
+        out[deck["id"]] = build(slides_dir, deck_dir(build_root, deck["id"]), spec, thumb_w, widths, workers,
+                                log=log, force=force, zoom=zoom)
+    keep = {deck_slug(prefix) for prefix in out}
+    if os.path.isdir(build_root):
+        for f in os.listdir(build_root):
+            if f not in keep and os.path.isfile(os.path.join(build_root, f, MANIFEST_NAME)):
+                shutil.rmtree(os.path.join(build_root, f))
+                log(f"removed the build of a deck that is gone: {f}")
+    return out
+
+
+def load(path: str):
+    try:
+        with open(path, "rb") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get("version") != MANIFEST_VERSION:
+        return None
+    return manifest
+
+
+def is_current(manifest: dict, slides_dir: str) -> bool:
+    """
+    True if every slide in the manifest is still in `slides_dir` with the same size
+    and no other candidate file has appeared (one os.scandir).
+    """
+    try:
+        with os.scandir(slides_dir) as it:
+            sizes = {e.name: e.stat().st_size for e in it if e.is_file()}
+    except OSError:
+        return False
+    spec = manifest["deck"]
+    expected = discover(_Listing(sizes), spec["prefix"], spec["ext"], spec["start"], spec["end"], spec["suffix_order"])
+    if expected != [s["name"] for s in manifest["slides"]]:
+        return False
+    return all(sizes.get(s["name"]) == s["bytes"] for s in manifest["slides"])
+
+
+class _Listing(SlideSource):
+    """A source whose listing is already known."""
+
+    def __init__(self, names):
+        self.names = list(names)
+
+    def list_names(self):
+        return self.names
+
+    def exists(self, name):
+        return name in self.names
+
+    def read(self, name):
+        raise FileNotFoundError(f"{name}: a listing has no file contents")
+
+
+def current_decks(build_root: str, slides_dir: str, thumb_w: int) -> dict:
+    """{deck prefix: manifest} for every deck build under `build_root` that still matches `slides_dir`."""
+    out = {}
+    try:
+        folders = os.listdir(build_root)
+    except OSError:
+        return out
+    for f in folders:
+        m = load(os.path.join(build_root, f, MANIFEST_NAME))
+        if m is not None and m["thumb_max_w"] == thumb_w and is_current(m, slides_dir):
+            out[m["deck"]["prefix"]] = m
+    return out
@@ -0,0 +1,72 @@
+# ------------------------------------------------------------
+# In-memory byte store shared by all sessions of the server process
+# - hard limit on total bytes, least recently used entries evicted first
+# - optional time-to-live per entry
+# - get() returns the stored bytes object itself (bytes are immutable: no copies);
+#   peek() looks without counting a hit / miss or refreshing the entry's recency
+# - hit / miss / eviction counters for the debug panel
+# ------------------------------------------------------------
+import threading
+import time
+from collections import OrderedDict
+
+
+class ByteLRU:
+    def __init__(self, max_bytes: int, ttl: float = None):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._items = OrderedDict()   # key -> (expires_at | None, data)
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            item = self._items.get(key)
+            if item is not None and item[0] is not None and item[0] < time.monotonic():
+                self._drop(key)
+                item = None
+            if item is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return item[1]
+
+    def peek(self, key):
+        """The stored bytes, or None; unlike get() it leaves the counters and the LRU order alone."""
+        with self._lock:
+            item = self._items.get(key)
+        if item is None or (item[0] is not None and item[0] < time.monotonic()):
+            return None
+        return item[1]
+
+    def put(self, key, data: bytes) -> None:
+        if len(data) > self.max_bytes:
+            return
+        expires = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            if key in self._items:
+                self._drop(key)
+            self._items[key] = (expires, data)
+            self._size += len(data)
+            while self._size > self.max_bytes:
+                self._drop(next(iter(self._items)))
+                self.evictions += 1
+
+    def _drop(self, key) -> None:
+        _, data = self._items.pop(key)
+        self._size -= len(data)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._items),
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
@@ -0,0 +1,178 @@
+# ------------------------------------------------------------
+# Timing instrumentation
+# - span(name) / timed(name): time a block or function
+# - count(name, n): count events (cache hits/misses, 304s, ...)
+# Everything goes into process-wide totals; spans/counts made on the thread
+# that runs a page also go into that rerun's Recorder (start_rerun/finish_rerun),
+# which is what the debug panel shows and what is appended as one JSON line.
+# prometheus_text() renders the totals in Prometheus text format.
+# ------------------------------------------------------------
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from workshop.files import write_atomic
+
+_current = contextvars.ContextVar("slides_rerun_recorder", default=None)
+
+_lock = threading.Lock()
+_span_totals = {}    # name -> [count, total_s, max_s]
+_count_totals = {}   # name -> n
+_last_prom_write = 0.0
+
+
+class Recorder:
+    """Timings of one script rerun."""
+
+    def __init__(self, page: str, session: str = ""):
+        self.page = page
+        self.session = session
+        self.started = time.time()
+        self._t0 = time.perf_counter()
+        self.spans = {}    # name -> [count, total_s]
+        self.counts = {}
+        self._lock = threading.Lock()
+
+    def add_span(self, name: str, seconds: float) -> None:
+        with self._lock:
+            s = self.spans.setdefault(name, [0, 0.0])
+            s[0] += 1
+            s[1] += seconds
+
+    def add_count(self, name: str, n: int) -> None:
+        with self._lock:
+            self.counts[name] = self.counts.get(name, 0) + n
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self._t0
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return {
+                "ts": round(self.started, 3),
+                "page": self.page,
+                "session": self.session,
+                "total_s": round(self.elapsed(), 6),
+                "spans": {k: {"n": n, "s": round(t, 6)} for k, (n, t) in self.spans.items()},
+                "counts": dict(self.counts),
+            }
+
+
+@contextmanager
+def span(name: str):
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        dt = time.perf_counter() - t0
+        with _lock:
+            s = _span_totals.setdefault(name, [0, 0.0, 0.0])
+            s[0] += 1
+            s[1] += dt
+            s[2] = max(s[2], dt)
+        rec = _current.get()
+        if rec is not None:
+            rec.add_span(name, dt)
+
+
+def timed(name: str):
+    """Decorator form of span()."""
+    def deco(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return deco
+
+
+def count(name: str, n: int = 1) -> None:
+    with _lock:
+        _count_totals[name] = _count_totals.get(name, 0) + n
+    rec = _current.get()
+    if rec is not None:
+        rec.add_count(name, n)
+
+
+def start_rerun(page: str, session: str = "") -> Recorder:
+    rec = Recorder(page, session)
+    _current.set(rec)
+    return rec
+
+
+JSONL_MAX_BYTES = 20 * 1024 * 1024   # then the log is rotated to <name>.1
+
+
+def finish_rerun(rec: Recorder, jsonl_path: str = "", prom_path: str = "", prom_every: float = 5.0,
+                 extra_gauges: dict = None) -> dict:
+    """
+    Close the rerun: append it to `jsonl_path` and refresh `prom_path` (at most every `prom_every` s).
+    File errors (read-only checkout, full disk) never reach the page: they are counted as metrics.write_error.
+    """
+    global _last_prom_write
+    _current.set(None)
+    row = rec.as_dict()
+    with _lock:
+        s = _span_totals.setdefault(f"{rec.page}.rerun", [0, 0.0, 0.0])
+        s[0] += 1
+        s[1] += row["total_s"]
+        s[2] = max(s[2], row["total_s"])
+    if jsonl_path:
+        try:
+            os.makedirs(os.path.dirname(jsonl_path) or ".", exist_ok=True)
+            with _lock:
+                try:
+                    if os.path.getsize(jsonl_path) > JSONL_MAX_BYTES:
+                        os.replace(jsonl_path, jsonl_path + ".1")
+                except OSError:
+                    pass
+                with open(jsonl_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(row) + "\n")
+        except OSError:
+            count("metrics.write_error")
+    if prom_path and time.monotonic() - _last_prom_write >= prom_every:
+        _last_prom_write = time.monotonic()
+        try:
+            write_prometheus(prom_path, extra_gauges)
+        except OSError:
+            count("metrics.write_error")
+    return row
+
+
+def totals() -> dict:
+    with _lock:
+        return {
+            "spans": {k: {"n": n, "s": t, "max_s": m} for k, (n, t, m) in _span_totals.items()},
+            "counts": dict(_count_totals),
+        }
+
+
+def _metric_name(name: str) -> str:
+    return "".join(c if c.isalnum() else "_" for c in name)
+
+
+def prometheus_text(extra_gauges: dict = None) -> str:
+    t = totals()
+    lines = [
+        "# HELP slides_span_seconds_total Time spent in instrumented blocks.",
+        "# TYPE slides_span_seconds_total counter",
+    ]
+    lines += [f'slides_span_seconds_total{{span="{_metric_name(k)}"}} {v["s"]:.6f}' for k, v in sorted(t["spans"].items())]
+    lines += ["# HELP slides_span_calls_total Calls of instrumented blocks.", "# TYPE slides_span_calls_total counter"]
+    lines += [f'slides_span_calls_total{{span="{_metric_name(k)}"}} {v["n"]}' for k, v in sorted(t["spans"].items())]
+    lines += ["# HELP slides_span_max_seconds Slowest single call.", "# TYPE slides_span_max_seconds gauge"]
+    lines += [f'slides_span_max_seconds{{span="{_metric_name(k)}"}} {v["max_s"]:.6f}' for k, v in sorted(t["spans"].items())]
+    lines += ["# HELP slides_events_total Counted events (cache hits/misses, revalidations, ...).",
+              "# TYPE slides_events_total counter"]
+    lines += [f'slides_events_total{{event="{_metric_name(k)}"}} {v}' for k, v in sorted(t["counts"].items())]
+    for name, value in sorted((extra_gauges or {}).items()):
+        lines += [f"# TYPE slides_{_metric_name(name)} gauge", f"slides_{_metric_name(name)} {value}"]
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus(path: str, extra_gauges: dict = None) -> None:
+    write_atomic(path, prometheus_text(extra_gauges).encode("utf-8"))
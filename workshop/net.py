@@ -0,0 +1,117 @@
+# ------------------------------------------------------------
+# Shared HTTP session for every remote fetch
+# - one pooled requests.Session per process (keep-alive, no new TLS handshake per file)
+# - bounded retries with backoff for connection errors and 429/5xx
+# - status(): HEAD request, for existence checks without downloading the body
+# - fetch():  GET with ETag / If-Modified-Since revalidation; a 304 reuses the stored body
+# - fetch_prefix(): the first bytes of a file only (a Range request), e.g. an image header
+# ------------------------------------------------------------
+import threading
+from collections import OrderedDict
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from workshop import metrics
+
+POOL_SIZE        = 32
+RETRIES          = 3
+BACKOFF          = 0.3                 # 0.3s, 0.6s, 1.2s between attempts
+RETRY_STATUSES   = (429, 500, 502, 503, 504)
+VALIDATED_BYTES  = 64 * 1024 * 1024    # bodies kept for revalidation (LRU)
+
+_session = None
+_session_lock = threading.Lock()
+
+# url -> (etag, last_modified, body), least recently used first
+_validated = OrderedDict()
+_validated_size = 0
+_validated_lock = threading.Lock()
+
+
+def session() -> requests.Session:
+    global _session
+    with _session_lock:
+        if _session is None:
+            retry = Retry(
+                total=RETRIES,
+                backoff_factor=BACKOFF,
+                status_forcelist=RETRY_STATUSES,
+                allowed_methods=frozenset({"GET", "HEAD"}),
+                raise_on_status=False,   # hand the last response back instead of raising
+            )
+            adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE, max_retries=retry)
+            s = requests.Session()
+            s.mount("https://", adapter)
+            s.mount("http://", adapter)
+            _session = s
+        return _session
+
+
+@metrics.timed("http.head")
+def status(url: str, timeout: float) -> int:
+    """HTTP status of a HEAD request (redirects followed). Raises requests.RequestException on network errors."""
+    r = session().head(url, timeout=timeout, allow_redirects=True)
+    r.close()
+    return r.status_code
+
+
+def _remember(url: str, etag, last_modified, body: bytes) -> None:
+    global _validated_size
+    if not (etag or last_modified) or len(body) > VALIDATED_BYTES:
+        return
+    with _validated_lock:
+        old = _validated.pop(url, None)
+        if old:
+            _validated_size -= len(old[2])
+        _validated[url] = (etag, last_modified, body)
+        _validated_size += len(body)
+        while _validated_size > VALIDATED_BYTES:
+            _, (_, _, dropped) = _validated.popitem(last=False)
+            _validated_size -= len(dropped)
+
+
+@metrics.timed("http.get")
+def fetch(url: str, timeout: float, headers: dict = None) -> bytes:
+    """
+    GET `url` and return the body, raising for 4xx/5xx.
+    If an earlier response had an ETag or Last-Modified, the request is conditional
+    and an unchanged file costs a 304 instead of a full download.
+    """
+    headers = dict(headers or {})
+    with _validated_lock:
+        known = _validated.get(url)
+        if known:
+            _validated.move_to_end(url)
+    if known:
+        etag, last_modified, _ = known
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+
+    r = session().get(url, timeout=timeout, headers=headers)
+    if r.status_code == 304 and known:
+        metrics.count("http.not_modified")
+        return known[2]
+    r.raise_for_status()
+    body = r.content
+    _remember(url, r.headers.get("ETag"), r.headers.get("Last-Modified"), body)
+    return body
+
+
+@metrics.timed("http.range")
+def fetch_prefix(url: str, timeout: float, n: int) -> bytes:
+    """
+    The first `n` bytes of `url`, raising for 4xx/5xx. A server that ignores the Range header
+    sends the whole file; the rest of it is not read.
+    """
+    data = b""
+    with session().get(url, timeout=timeout, headers={"Range": f"bytes=0-{n - 1}"}, stream=True) as r:
+        r.raise_for_status()
+        for chunk in r.iter_content(64 * 1024):
+            data += chunk
+            if len(data) >= n:
+                break
+    return data[:n]
@@ -0,0 +1,107 @@
+# ------------------------------------------------------------
+# Lossless recompression of slide PNGs
+# - an alpha channel that is 255 everywhere is dropped (RGBA -> RGB, LA -> L)
+# - images with at most 256 colours are also tried as an exact palette (P) image
+# - every candidate is decoded again and compared pixel by pixel with the original;
+#   the smallest identical one wins, and a file is only replaced if it gets smaller
+# - ICC profile and EXIF are kept
+# ------------------------------------------------------------
+import io
+import os
+import time
+from dataclasses import dataclass
+
+import numpy as np
+from PIL import Image
+
+from workshop.files import write_atomic
+
+
+@dataclass
+class Result:
+    name: str
+    mode_before: str
+    mode_after: str
+    bytes_before: int
+    bytes_after: int
+    decode_ms_before: float
+    decode_ms_after: float
+    replaced: bool = False
+
+    @property
+    def saved(self) -> int:
+        return self.bytes_before - self.bytes_after
+
+
+def _decode(raw: bytes) -> tuple[Image.Image, float]:
+    t0 = time.perf_counter()
+    im = Image.open(io.BytesIO(raw))
+    im.load()
+    return im, (time.perf_counter() - t0) * 1000
+
+
+def is_opaque(im: Image.Image) -> bool:
+    """True if `im` has no alpha channel or its alpha is 255 for every pixel."""
+    if im.mode in ("RGBA", "LA"):
+        return im.getchannel("A").getextrema() == (255, 255)
+    if im.mode == "P" and "transparency" in im.info:
+        return False
+    return True
+
+
+def exact_palette(im: Image.Image):
+    """`im` (RGB) as a P image with exactly the same pixels, or None if it has more than 256 colours."""
+    if im.getcolors(256) is None:
+        return None
+    rgb = np.asarray(im, dtype=np.uint32)
+    packed = (rgb[..., 0] << 16) | (rgb[..., 1] << 8) | rgb[..., 2]
+    colors, index = np.unique(packed, return_inverse=True)
+    p = Image.fromarray(index.reshape(packed.shape).astype(np.uint8), "P")
+    p.putpalette(np.stack([colors >> 16, (colors >> 8) & 255, colors & 255], axis=1).astype(np.uint8).tobytes())
+    return p
+
+
+def _encode(im: Image.Image, info: dict) -> bytes:
+    buf = io.BytesIO()
+    extra = {k: info[k] for k in ("icc_profile", "exif") if info.get(k)}
+    im.save(buf, format="PNG", optimize=True, **extra)
+    return buf.getvalue()
+
+
+def _same_pixels(a: Image.Image, b: Image.Image) -> bool:
+    return a.size == b.size and a.convert("RGBA").tobytes() == b.convert("RGBA").tobytes()
+
+
+def optimize_png(raw: bytes, palette: bool = True) -> tuple[bytes, str]:
+    """Smallest pixel-identical PNG encoding of `raw` and its mode (`raw` itself if nothing beats it)."""
+    im, _ = _decode(raw)
+    base = im
+    if is_opaque(im) and im.mode in ("RGBA", "LA"):
+        base = im.convert("RGB" if im.mode == "RGBA" else "L")
+
+    candidates = [base]
+    if palette and base.mode == "RGB":
+        p = exact_palette(base)
+        if p is not None:
+            candidates.append(p)
+
+    best, best_mode = raw, im.mode
+    for c in candidates:
+        data = _encode(c, im.info)
+        if len(data) < len(best) and _same_pixels(_decode(data)[0], im):
+            best, best_mode = data, c.mode
+    return best, best_mode
+
+
+def optimize_file(path: str, palette: bool = True, write: bool = True) -> Result:
+    """Recompress `path` in place (atomically) if a smaller identical encoding exists."""
+    with open(path, "rb") as f:
+        raw = f.read()
+    im, ms_before = _decode(raw)
+    data, mode = optimize_png(raw, palette)
+    _, ms_after = _decode(data)
+    r = Result(os.path.basename(path), im.mode, mode, len(raw), len(data), ms_before, ms_after)
+    if write and data is not raw:
+        write_atomic(path, data)
+        r.replaced = True
+    return r
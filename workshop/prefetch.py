@@ -0,0 +1,43 @@
+# ------------------------------------------------------------
+# Prefetching
+# - neighbours(): slides around the current one, nearest first (next before previous)
+# - Prefetcher:   runs cache warm-up jobs on a few background threads,
+#                 skipping a job whose key is already queued or running
+# ------------------------------------------------------------
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+def neighbours(idx: int, total: int, window: int) -> list[int]:
+    """[idx+1, idx-1, idx+2, idx-2, ...] up to `window` steps each way, wrapping around."""
+    out = []
+    for step in range(1, window + 1):
+        for j in ((idx + step) % total, (idx - step) % total):
+            if j != idx and j not in out:
+                out.append(j)
+    return out
+
+
+class Prefetcher:
+    def __init__(self, workers: int = 2):
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="prefetch")
+        self._pending = set()
+        self._lock = threading.Lock()
+
+    def submit(self, key, fn, *args) -> bool:
+        """Run fn(*args) in the background unless `key` is already pending. Errors are swallowed."""
+        with self._lock:
+            if key in self._pending:
+                return False
+            self._pending.add(key)
+        self._pool.submit(self._run, key, fn, args)
+        return True
+
+    def _run(self, key, fn, args):
+        try:
+            fn(*args)
+        except Exception:
+            pass  # a failed warm-up just means the real request does the work
+        finally:
+            with self._lock:
+                self._pending.discard(key)
@@ -0,0 +1,47 @@
+# ------------------------------------------------------------
+# Presenter: client-side slide player (a Streamlit custom component)
+# - the browser gets the whole slide list once and navigates on its own:
+#   next / prev / go to, arrow keys, fit to height or width, no server round trip
+# - slides are preloaded progressively: neighbours first, then the rest, one at a time
+# - the current index is sent back only after navigation has settled (report_delay_ms)
+# - frontend/index.html speaks the component protocol directly (no build step);
+#   the player itself is frontend/player.js, shared with the static site export
+# ------------------------------------------------------------
+import os
+
+import streamlit.components.v1 as components
+
+_FRONTEND = os.path.join(os.path.dirname(os.path.abspath(__file__)), "frontend")
+_component = components.declare_component("slide_presenter", path=_FRONTEND)
+
+
+def presenter(
+    slides: list[dict],
+    index: int = 0,
+    fit_to_height: bool = True,
+    vh_percent: int = 88,
+    width_px: int = 1000,
+    preload_ahead: int = 2,
+    report_delay_ms: int = 800,
+    key: str = None,
+    on_change=None,
+) -> int:
+    """
+    Show `slides` ([{"src", "srcset": [[url, width], ...], "width", "height", "lqip"}, ...], only "src"
+    required; "lqip" is a placeholder from workshop.thumbs.make_lqip)
+    starting at `index`. Relative URLs are resolved against the app's base URL.
+    Passing a different `index` on a later run moves the presenter there.
+    Returns the last index the browser reported (`index` until it reports one).
+    """
+    return _component(
+        slides=slides,
+        index=index,
+        fit=fit_to_height,
+        vh=vh_percent,
+        width_px=width_px,
+        preload_ahead=preload_ahead,
+        report_delay_ms=report_delay_ms,
+        key=key,
+        default=index,
+        on_change=on_change,
+    )
@@ -0,0 +1,137 @@
+// ------------------------------------------------------------
+// Slide player shared by the presenter component (index.html) and the
+// static site export (workshop/export.py)
+// - expects the #bar / #stage markup of index.html and player.css
+// - slides: {src, srcset: [[url, width], ...], width, height, lqip: {data, color}}, only src required;
+//   lqip is drawn as the <img> background until the slide has loaded, then removed
+// - createPlayer({base, onMove, onLoad}):
+//     base    URL that relative slide URLs are resolved against
+//     onMove  called with the new index after the viewer navigated
+//             (buttons, keys, goto box); not for show(i, false)
+//     onLoad  called when the visible slide has loaded
+// ------------------------------------------------------------
+function createPlayer(opts) {
+  const abs = (url) => new URL(url, opts.base).href;
+
+  const img = document.getElementById("slide");
+  const count = document.getElementById("count");
+  const gotoInput = document.getElementById("goto");
+  const fitBtn = document.getElementById("fit");
+  const statusEl = document.getElementById("status");
+
+  let slides = [];
+  let cur = 0;
+  let fit = true, vh = 88, widthPx = 1000;
+  let ahead = 2;
+  let preloaded = new Set(), preloadRun = 0;
+
+  function viewportH() {
+    try { return window.parent.innerHeight; } catch (e) { return screen.availHeight; }
+  }
+
+  function displayWidth(s) {
+    const maxW = document.body.clientWidth || window.innerWidth;
+    if (!fit) return Math.min(widthPx, maxW);
+    const aspect = s.width && s.height ? s.width / s.height : 16 / 9;
+    return Math.min(viewportH() * vh / 100 * aspect, maxW);
+  }
+
+  function assign(el, s) {
+    // same srcset/sizes for preloads and the visible slide, so the browser picks the same file
+    const w = Math.round(displayWidth(s));
+    if (s.srcset && s.srcset.length) {
+      el.sizes = w + "px";
+      el.srcset = s.srcset.map(([url, width]) => abs(url) + " " + width + "w").join(", ");
+    } else {
+      el.removeAttribute("srcset");
+    }
+    el.src = abs(s.src);
+    return w;
+  }
+
+  function show(i, moved) {
+    if (!slides.length) return;
+    cur = ((i % slides.length) + slides.length) % slides.length;
+    const s = slides[cur];
+    const w = assign(img, s);
+    img.alt = "Slide " + (cur + 1);
+    img.style.width = w + "px";
+    // the inline placeholder fills the slide's box until the image has loaded (cleared in onload,
+    // so it never shows through a transparent slide)
+    img.style.aspectRatio = s.width && s.height ? s.width + " / " + s.height : "";
+    img.style.background = s.lqip && !(img.complete && img.naturalWidth)
+      ? `${s.lqip.color} url("${s.lqip.data}") center / 100% 100% no-repeat` : "";
+    img.style.maxHeight = fit ? vh * viewportH() / 100 + "px" : "none";
+    count.textContent = (cur + 1) + " / " + slides.length;
+    gotoInput.value = cur + 1;
+    fitBtn.textContent = fit ? "↕ Fit height" : "↔ " + widthPx + "px";
+    if (moved && opts.onMove) opts.onMove(cur);
+    preload();
+  }
+
+  function preloadOrder() {
+    const n = slides.length, order = [];
+    for (let d = 1; d <= ahead; d++) order.push((cur + d) % n, (cur - d + n) % n);
+    for (let d = 1; d < n; d++) order.push((cur + d) % n);
+    return order.filter((j, k) => j !== cur && order.indexOf(j) === k);
+  }
+
+  async function preload() {
+    // one image at a time, nearest first; a new navigation restarts the queue from there
+    const run = ++preloadRun;
+    for (const j of preloadOrder()) {
+      if (run !== preloadRun) return;
+      const s = slides[j];
+      const key = s.src + "@" + Math.round(displayWidth(s));
+      if (preloaded.has(key)) continue;
+      const pre = new Image();
+      assign(pre, s);
+      try { await pre.decode(); } catch (e) { /* broken image: the <img> shows it when visited */ }
+      preloaded.add(key);
+      statusEl.textContent = "preloaded " + Math.min(preloaded.size, slides.length) + " / " + slides.length;
+    }
+  }
+
+  document.getElementById("first").onclick = () => show(0, true);
+  document.getElementById("prev").onclick = () => show(cur - 1, true);
+  document.getElementById("next").onclick = () => show(cur + 1, true);
+  gotoInput.onchange = () => {
+    const n = parseInt(gotoInput.value, 10);
+    if (n >= 1 && n <= slides.length) show(n - 1, true);
+  };
+  fitBtn.onclick = () => { fit = !fit; preloaded.clear(); show(cur, false); };
+  img.onload = () => {
+    img.style.background = "";
+    if (opts.onLoad) opts.onLoad();
+  };
+
+  function onKey(e) {
+    const t = e.target;
+    if (t && (t.isContentEditable || /^(INPUT|TEXTAREA|SELECT)$/.test(t.tagName))) return;
+    const keys = {
+      ArrowRight: 1, ArrowDown: 1, PageDown: 1, " ": 1,
+      ArrowLeft: -1, ArrowUp: -1, PageUp: -1,
+    };
+    if (e.key in keys) show(cur + keys[e.key], true);
+    else if (e.key === "Home") show(0, true);
+    else if (e.key === "End") show(slides.length - 1, true);
+    else return;
+    e.preventDefault();
+  }
+  document.addEventListener("keydown", onKey);
+  // in an iframe, arrow keys also work while the focus is on the page around it
+  let parentDoc = null;
+  if (window.parent !== window) {
+    try { parentDoc = window.parent.document; parentDoc.addEventListener("keydown", onKey); } catch (e) { parentDoc = null; }
+  }
+  window.addEventListener("pagehide", () => { if (parentDoc) parentDoc.removeEventListener("keydown", onKey); });
+
+  return {
+    get index() { return cur; },
+    get count() { return slides.length; },
+    setSlides(list) { slides = list; gotoInput.max = list.length; },
+    setLayout(fitToHeight, vhPercent, width) { fit = fitToHeight; vh = vhPercent; widthPx = width; preloaded.clear(); },
+    setPreload(n) { ahead = n; },
+    show: show,
+  };
+}
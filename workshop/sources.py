@@ -0,0 +1,233 @@
+# ------------------------------------------------------------
+# Slide sources
+# - HttpSource:  slides on raw.githubusercontent.com (or any static host), via workshop.net
+# - LocalSource: slides in a folder of this checkout (one scandir, mmap reads)
+# - discover():  "first matching suffix wins" resolution over any source
+# ------------------------------------------------------------
+import abc
+import hashlib
+import json
+import mmap
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+import requests
+
+from workshop import net
+
+HEAD_BYTES = 64 * 1024   # read_head(): covers PNG/WebP headers and a JPEG's EXIF block before its size
+
+
+class ProbeError(Exception):
+    """A slide could not be checked (timeout, connection error, 5xx...), as opposed to a real 404."""
+
+
+class PartialDiscovery(Exception):
+    """Raised by discover() so that an incomplete result is never cached."""
+
+    def __init__(self, names, failed):
+        super().__init__(f"{len(failed)} slide(s) could not be checked")
+        self.names = names
+        self.failed = failed
+
+
+class SlideSource(abc.ABC):
+    """
+    Where slide images come from. Subclasses must implement exists() and read(), and may override the rest:
+      list_names()  -> all file names in one call, or None if the source can't list
+      exists(name)  -> True / False, or raise ProbeError when it can't tell
+      read(name)    -> the file's bytes
+      read_head(name) -> the first bytes of the file (enough for an image header)
+      url_for(name) -> a URL the browser can load, or None (serve the bytes instead)
+      version(name) -> a token that changes when the file (or, with no name, the folder) changes
+      content_hash(name) -> sha256 of the file's bytes (keys derived images on disk)
+    """
+
+    def list_names(self):
+        return None
+
+    @abc.abstractmethod
+    def exists(self, name: str) -> bool:
+        ...
+
+    def probe(self, names: list[str]) -> dict:
+        """{name: True | False | ProbeError} for every name."""
+        out = {}
+        for n in names:
+            try:
+                out[n] = self.exists(n)
+            except ProbeError as e:
+                out[n] = e
+        return out
+
+    @abc.abstractmethod
+    def read(self, name: str) -> bytes:
+        ...
+
+    def read_head(self, name: str, n: int = HEAD_BYTES) -> bytes:
+        return self.read(name)[:n]
+
+    def url_for(self, name: str):
+        return None
+
+    def version(self, name: str = ""):
+        return None
+
+    def content_hash(self, name: str) -> str:
+        return hashlib.sha256(self.read(name)).hexdigest()
+
+
+@dataclass(frozen=True)
+class HttpSource(SlideSource):
+    raw_base: str
+    api_list_url: str = ""   # GitHub contents API URL; "" = always probe
+    timeout: float = 8
+    workers: int = 16
+
+    def list_names(self):
+        """File names from a single GitHub contents API call (None if it fails, e.g. rate-limited)."""
+        if not self.api_list_url:
+            return None
+        try:
+            # conditional: an unchanged folder costs a 304 (which GitHub doesn't count against the rate limit)
+            body = net.fetch(self.api_list_url, self.timeout, headers={"Accept": "application/vnd.github+json"})
+            return [item["name"] for item in json.loads(body) if item.get("type") == "file"]
+        except (requests.RequestException, ValueError, KeyError, TypeError):
+            return None
+
+    def exists(self, name: str) -> bool:
+        """True for 200, False for 403/404/410; anything else raises ProbeError."""
+        url = self.url_for(name)
+        try:
+            status = net.status(url, self.timeout)   # HEAD: no body download
+        except requests.RequestException as e:
+            raise ProbeError(f"{url}: {e}") from e
+        if status == 200:
+            return True
+        if status in (403, 404, 410):
+            return False
+        raise ProbeError(f"{url}: HTTP {status}")
+
+    def probe(self, names: list[str]) -> dict:
+        """Check all names concurrently, at most `workers` requests in flight."""
+        if not names:
+            return {}
+        with ThreadPoolExecutor(max_workers=max(1, min(self.workers, len(names)))) as pool:
+            return dict(zip(names, pool.map(lambda n: SlideSource.probe(self, [n])[n], names)))
+
+    def read(self, name: str) -> bytes:
+        return net.fetch(self.url_for(name), self.timeout)
+
+    def read_head(self, name: str, n: int = HEAD_BYTES) -> bytes:
+        return net.fetch_prefix(self.url_for(name), self.timeout, n)
+
+    def url_for(self, name: str):
+        return f"{self.raw_base}/{name}"
+
+
+# (path, mtime_ns, size) -> sha256, so a slide is hashed once until it changes
+_hash_memo = {}
+_hash_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class LocalSource(SlideSource):
+    root: str
+    public_base: str = ""    # optional URL the browser should use instead of inlined bytes
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.root, name)
+
+    def list_names(self):
+        """One os.scandir() of the folder."""
+        try:
+            with os.scandir(self.root) as it:
+                return [e.name for e in it if e.is_file()]
+        except OSError:
+            return []
+
+    def exists(self, name: str) -> bool:
+        return os.path.isfile(self._path(name))
+
+    def read(self, name: str) -> bytes:
+        with open(self._path(name), "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return b""
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+                return m[:]
+
+    def read_head(self, name: str, n: int = HEAD_BYTES) -> bytes:
+        with open(self._path(name), "rb") as f:
+            return f.read(n)
+
+    def url_for(self, name: str):
+        return f"{self.public_base}/{name}" if self.public_base else None
+
+    def version(self, name: str = ""):
+        """mtime (ns) of the file, or of the folder when no name is given."""
+        try:
+            return os.stat(self._path(name) if name else self.root).st_mtime_ns
+        except OSError:
+            return None
+
+    def content_hash(self, name: str) -> str:
+        p = self._path(name)
+        st = os.stat(p)
+        memo_key = (p, st.st_mtime_ns, st.st_size)
+        with _hash_lock:
+            h = _hash_memo.get(memo_key)
+        if h is None:
+            h = hashlib.sha256(self.read(name)).hexdigest()
+            with _hash_lock:
+                _hash_memo[memo_key] = h
+        return h
+
+
+def candidates(prefix: str, ext: str, start_i: int, end_i: int, suffix_order: list[str]):
+    """[(i, [name for each suffix, in try order]), ...]"""
+    return [
+        (i, [f"{prefix}{i:03d}{suf}{ext}" for suf in suffix_order])
+        for i in range(start_i, end_i + 1)
+    ]
+
+
+def discover(source: SlideSource, prefix: str, ext: str, start_i: int, end_i: int, suffix_order: list[str]):
+    """
+    Discover slides in strict numeric order:
+      For each number i, choose the FIRST existing candidate among:
+        prefix + i(3digits) + suffix + ext
+
+    Uses one source.list_names() call when the source can list, otherwise probes
+    every candidate. If any candidate could not be checked, PartialDiscovery is
+    raised carrying what was found.
+    """
+    cands = candidates(prefix, ext, start_i, end_i, suffix_order)
+    all_names = [name for _, tries in cands for name in tries]
+
+    listed = source.list_names()
+    if listed is not None:
+        present = set(listed)
+        status = {name: name in present for name in all_names}
+    else:
+        status = source.probe(all_names)
+
+    names = []
+    failed = []
+    for i, tries in cands:
+        for name in tries:
+            found = status[name]
+            if isinstance(found, ProbeError):
+                # Unknown, not missing: don't fall through to a later suffix,
+                # which could pick the wrong file for this number.
+                failed.append(name)
+                break
+            if found:
+                names.append(name)
+                break
+        # a missing number is skipped (useful if you intentionally have gaps)
+
+    if failed:
+        raise PartialDiscovery(names, failed)
+    return names
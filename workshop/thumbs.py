@@ -0,0 +1,248 @@
+# ------------------------------------------------------------
+# Thumbnails and other resized copies of slides
+# - render_webp(): one slide -> WebP at most max_w wide (white background for transparent PNGs)
+#   decode_resized() + flatten_white() + encode_webp(): reduce early, composite only real alpha
+# - render_many(): many (slide, width, quality) jobs on a process pool, results in input order
+#   (pool_map(): the same pool for other per-slide jobs, e.g. workshop.deepzoom)
+# - make_thumbs(): the same with the thumbnail settings
+# - cached_thumbs(): make_thumbs() behind a DiskCache, so restarts skip image work
+# - make_lqip(): a tiny blurred placeholder (LQIP) + average colour, inlined as a data URI
+#   and drawn as the background of the <img> until the real image paints over it
+# - image_info(): size and opacity from an image header, without decoding the pixels
+# ------------------------------------------------------------
+import base64
+import io
+import os
+import sys
+import types
+import threading
+import multiprocessing
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+from PIL import Image
+
+from workshop import metrics
+from workshop.diskcache import derivative_key
+
+THUMB_FORMAT  = "WEBP"
+THUMB_QUALITY = 92
+# WebP encoder effort, 0 (fastest) .. 6 (smallest files); 4 is libwebp's default.
+WEBP_METHOD   = 4
+# Downscale with reduce() until within REDUCING_GAP x of the target, then LANCZOS (Pillow's reducing_gap).
+REDUCING_GAP  = 2.0
+INLINE_BATCH  = 8    # decoded images held at once when rendering without the pool
+
+# display-size copies of the main slide (see build_slides.py)
+VARIANT_WIDTHS  = [640, 960, 1280, 1920]
+VARIANT_QUALITY = 85
+
+# placeholders: LQIP_WIDTH px wide, a few hundred bytes; the browser's upscaling blurs them
+LQIP_WIDTH   = 24
+LQIP_QUALITY = 40
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def has_alpha(im: Image.Image) -> bool:
+    """True if `im` has an alpha channel that is not 255 everywhere."""
+    if im.mode == "P":
+        return "transparency" in im.info
+    if im.mode not in ("RGBA", "LA", "PA"):
+        return False
+    return im.getchannel("A").getextrema()[0] < 255
+
+
+def decode_resized(raw: bytes, max_w: int) -> Image.Image:
+    """
+    Decode `raw` at most max_w wide, as RGB (opaque) or RGBA (real transparency).
+    JPEGs are decoded at a reduced scale (draft); big reductions go through a cheap
+    integer reduce() first and only the last REDUCING_GAP x step uses LANCZOS.
+    """
+    im = Image.open(io.BytesIO(raw))
+    w, h = im.size
+    size = (max_w, int(h * (max_w / w))) if w > max_w else (w, h)
+    if w > max_w and im.format == "JPEG":
+        im.draft("RGB", size)
+    im.load()
+    mode = "RGBA" if has_alpha(im) else "RGB"
+    if im.mode != mode:
+        im = im.convert(mode)
+    if im.size != size:
+        im = im.resize(size, Image.LANCZOS, reducing_gap=REDUCING_GAP)
+    return im
+
+
+def flatten_white(images: list) -> list:
+    """RGBA images composited onto white (RGB images pass through); same-size images in one NumPy pass."""
+    out = list(images)
+    groups = {}
+    for i, im in enumerate(images):
+        if im.mode == "RGBA":
+            groups.setdefault(im.size, []).append(i)
+    for idx in groups.values():
+        px = np.stack([np.asarray(images[i], dtype=np.uint16) for i in idx])
+        rgb, a = px[..., :3], px[..., 3:]
+        flat = ((rgb * a + 255 * (255 - a) + 127) // 255).astype(np.uint8)
+        for i, arr in zip(idx, flat):
+            out[i] = Image.fromarray(arr, "RGB")
+    return out
+
+
+def encode_webp(im: Image.Image, quality: int = THUMB_QUALITY, method: int = WEBP_METHOD) -> bytes:
+    buf = io.BytesIO()
+    im.save(buf, format=THUMB_FORMAT, quality=quality, method=method)
+    return buf.getvalue()
+
+
+def render_webp(raw: bytes, max_w: int, quality: int = THUMB_QUALITY, method: int = WEBP_METHOD) -> bytes:
+    return encode_webp(flatten_white([decode_resized(raw, max_w)])[0], quality, method)
+
+
+def _render_from_source(source, name: str, max_w: int, quality: int) -> bytes:
+    # Runs in a worker process: read there too, so slide bytes are never pickled across.
+    return render_webp(source.read(name), max_w, quality)
+
+
+@contextmanager
+def _neutral_main():
+    """
+    Streamlit runs each page as sys.modules["__main__"], and spawned workers
+    re-import __main__ on startup, i.e. they would re-run the page. Hide it while spawning.
+    """
+    main = sys.modules.get("__main__")
+    sys.modules["__main__"] = types.ModuleType("__main__")
+    try:
+        yield
+    finally:
+        sys.modules["__main__"] = main
+
+
+def _get_pool(workers: int):
+    """One long-lived pool per server process (spawn: safe next to Streamlit's threads)."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            # Start every worker now, so later submits never spawn while a page is __main__.
+            with _neutral_main():
+                for f in [pool.submit(int) for _ in range(workers)]:
+                    f.result()
+            _pool = pool
+        return _pool
+
+
+def default_workers() -> int:
+    return max(1, min(8, os.cpu_count() or 1))
+
+
+def _render_inline(source, jobs: list[tuple]) -> list[bytes]:
+    """The jobs in this process, INLINE_BATCH at a time so transparent ones are flattened together."""
+    out = []
+    for k in range(0, len(jobs), INLINE_BATCH):
+        part = jobs[k:k + INLINE_BATCH]
+        images = flatten_white([decode_resized(source.read(name), max_w) for name, max_w, _ in part])
+        out += [encode_webp(im, quality) for im, (_, _, quality) in zip(images, part)]
+    return out
+
+
+def pool_map(fn, jobs: list[tuple], workers: int = 0, inline=None) -> list:
+    """
+    fn(*job) for each job on the shared process pool, results in input order.
+    Single jobs (or workers=1) run in this process, through `inline(jobs)` if given.
+    """
+    inline = inline or (lambda jobs: [fn(*job) for job in jobs])
+    workers = workers or default_workers()
+    if workers == 1 or len(jobs) < 2:
+        return inline(jobs)
+    pool = _get_pool(workers)
+    try:
+        return list(pool.map(fn, *zip(*jobs)))
+    except BrokenProcessPool:
+        # A worker died (OOM, killed...): drop the pool so the next call starts a fresh one.
+        _reset_pool(pool)
+        return inline(jobs)
+
+
+@metrics.timed("thumbs.render_many")
+def render_many(source, jobs: list[tuple], workers: int = 0) -> list[bytes]:
+    """render_webp() for each (name, max_w, quality) job, in the same order. Small batches run inline."""
+    metrics.count("thumbs.rendered", len(jobs))
+    return pool_map(_render_from_source, [(source, *job) for job in jobs], workers,
+                    inline=lambda _: _render_inline(source, jobs))
+
+
+def make_lqip(raw: bytes, width: int = LQIP_WIDTH) -> dict:
+    """
+    Placeholder for the image `raw`: {"data": data URI of a tiny WebP, "color": average colour
+    "#rrggbb", "width"/"height": size of `raw`, for the aspect ratio}.
+    """
+    with Image.open(io.BytesIO(raw)) as probe:
+        w, h = probe.size
+    im = flatten_white([decode_resized(raw, width)])[0]
+    r, g, b = im.resize((1, 1), Image.BOX).getpixel((0, 0))
+    data = base64.b64encode(encode_webp(im, LQIP_QUALITY)).decode()
+    return {"data": f"data:image/webp;base64,{data}", "color": f"#{r:02x}{g:02x}{b:02x}", "width": w, "height": h}
+
+
+def image_info(head: bytes) -> dict:
+    """
+    {"width", "height", "opaque"} from the first bytes of an image (see SlideSource.read_head).
+    opaque is False when the format can carry transparency (a placeholder would show through it).
+    Raises OSError if the header can't be read.
+    """
+    with Image.open(io.BytesIO(head)) as probe:
+        w, h = probe.size
+        opaque = "A" not in probe.getbands() and "transparency" not in probe.info
+    return {"width": w, "height": h, "opaque": opaque}
+
+
+def lqip_background(lqip: dict) -> str:
+    """CSS `background` value that shows `lqip` stretched over the element, its colour under it."""
+    return f'{lqip["color"]} url({lqip["data"]}) center / 100% 100% no-repeat'
+
+
+def _lqip_from_source(source, name: str) -> dict:
+    return make_lqip(source.read(name))
+
+
+def make_lqips(source, names: list[str], workers: int = 0) -> list[dict]:
+    """make_lqip() for `names`, in the same order."""
+    return pool_map(_lqip_from_source, [(source, n) for n in names], workers)
+
+
+def make_thumbs(source, names: list[str], max_w: int, workers: int = 0) -> list[bytes]:
+    """Thumbnails for `names`, in the same order."""
+    return render_many(source, [(n, max_w, THUMB_QUALITY) for n in names], workers)
+
+
+def _reset_pool(broken):
+    global _pool
+    with _pool_lock:
+        if _pool is broken:
+            _pool = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+def thumb_key(content_hash: str, max_w: int) -> str:
+    return derivative_key(content_hash, kind="thumb", max_w=max_w, fmt=THUMB_FORMAT, quality=THUMB_QUALITY,
+                          method=WEBP_METHOD)
+
+
+def cached_thumbs(source, names: list[str], max_w: int, disk_cache=None, workers: int = 0) -> list[bytes]:
+    """make_thumbs() that first looks in `disk_cache` (a DiskCache) and stores what it builds."""
+    if disk_cache is None:
+        return make_thumbs(source, names, max_w, workers)
+
+    keys = [thumb_key(source.content_hash(n), max_w) for n in names]
+    out = [disk_cache.get(k) for k in keys]
+    todo = [i for i, data in enumerate(out) if data is None]
+    if todo:
+        built = make_thumbs(source, [names[i] for i in todo], max_w, workers)
+        for i, data in zip(todo, built):
+            disk_cache.put(keys[i], data)
+            out[i] = data
+    return out
@@ -0,0 +1,149 @@
+# ------------------------------------------------------------
+# Cache warm-up
+# - Warmer: runs a warm-up job in a background thread right away and again every
+#   `interval` seconds (a little less than the cache TTL), so cache entries are
+#   rebuilt before they expire and the cold path never reaches a viewer
+# - epochs: callers put warmer.epoch into their cache keys (the `version`
+#   arguments); a refresh builds the entries of the next epoch while the current
+#   ones keep serving, then switches over at once
+# - status(): state, runs, duration of the last run, next run (readiness report);
+#   statuses() reports every warmer started in this process
+# - preflight(): the part that outlives the process (thumbnails in the disk cache,
+#   content-hashed copies in static/assets), for warm_slides.py and serve.py
+# - progress goes to the "workshop.warmup" logger unless a `log` function is given
+# ------------------------------------------------------------
+import logging
+import os
+import threading
+import time
+
+from workshop import assets, catalog
+from workshop.sources import LocalSource
+from workshop.thumbs import cached_thumbs
+
+logger = logging.getLogger(__name__)
+
+_warmers = {}   # name -> Warmer started in this process
+_lock = threading.Lock()
+
+
+class Warmer:
+    def __init__(self, job, interval: float, name: str = "warm-up", log=None):
+        """
+        `job(epoch)` fills the caches for `epoch`; it is run every `interval` seconds (None = once).
+        `log(message)` reports each run (default: the module logger).
+        """
+        self.job = job
+        self.interval = interval
+        self.name = name
+        self.log = log
+        self.epoch = 0
+        self.runs = 0
+        self.state = "starting"
+        self.error = ""
+        self.last_seconds = None
+        self.next_run = None
+        self.started = time.time()
+        self.ready_after = None
+        self._ready = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name=self.name, daemon=True)
+            self._thread.start()
+            with _lock:
+                _warmers[self.name] = self
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def wait(self, timeout: float = None) -> bool:
+        """Block until the first run has finished (successfully or not); False on timeout."""
+        return self._ready.wait(timeout)
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            # the first run fills the epoch the page already uses; later runs fill the next one
+            target = self.epoch + 1 if self.runs else self.epoch
+            if not self.runs:
+                self.state = "warming"
+            t0 = time.perf_counter()
+            try:
+                self.job(target)
+            except Exception as e:   # keep the schedule; the page still works cold
+                self.error = f"{type(e).__name__}: {e}"
+                self.state = "error"
+                (self.log or logger.warning)(f"{self.name}: failed after {time.perf_counter() - t0:.2f}s: {self.error}")
+            else:
+                self.epoch = target
+                self.error = ""
+                self.state = "ready"
+                if self.ready_after is None:
+                    self.ready_after = time.time() - self.started
+                (self.log or logger.info)(f"{self.name}: epoch {target} ready in {time.perf_counter() - t0:.2f}s")
+            self.last_seconds = time.perf_counter() - t0
+            self.runs += 1
+            self._ready.set()
+            if self.interval is None:
+                return
+            self.next_run = time.time() + self.interval
+            self._stop.wait(self.interval)
+
+    def status(self) -> dict:
+        return {
+            "name": self.name,
+            "state": self.state,
+            "epoch": self.epoch,
+            "runs": self.runs,
+            "last_seconds": None if self.last_seconds is None else round(self.last_seconds, 3),
+            "ready_after_seconds": None if self.ready_after is None else round(self.ready_after, 3),
+            "next_run_in": None if self.next_run is None else max(0, round(self.next_run - time.time())),
+            "error": self.error,
+        }
+
+
+def statuses() -> list[dict]:
+    with _lock:
+        return [w.status() for w in _warmers.values()]
+
+
+def preflight(source, ext: str, suffix_order: list[str], thumb_w: int, disk_cache=None,
+              publish: bool = True, workers: int = 0, skip=(), log=None) -> dict:
+    """
+    Warm everything a fresh server process would otherwise build on the first request:
+    list the decks once, render every thumbnail into `disk_cache` and publish every slide
+    as a static asset (LocalSource). Decks in `skip` (e.g. covered by a build manifest) are
+    only listed. Returns per-step timings and counts.
+    """
+    log = log or logger.info
+    report = {"decks": 0, "slides": 0, "thumbs": 0, "published": 0}
+    t0 = time.perf_counter()
+    cat = catalog.build(source, ext, suffix_order)
+    if cat is None:
+        log("source cannot list its slides: nothing to warm")
+        report["seconds"] = round(time.perf_counter() - t0, 3)
+        return report
+    report["list_seconds"] = round(time.perf_counter() - t0, 3)
+
+    for deck in cat["decks"]:
+        report["decks"] += 1
+        report["slides"] += len(deck["slides"])
+        if deck["id"] in skip:
+            log(f"{deck['id']:12s} {len(deck['slides'])} slides, pre-built")
+            continue
+        t = time.perf_counter()
+        if disk_cache is not None:
+            cached_thumbs(source, deck["slides"], thumb_w, disk_cache, workers)
+            report["thumbs"] += len(deck["slides"])
+        if publish and isinstance(source, LocalSource):
+            for name in deck["slides"]:
+                if source.url_for(name) is None:
+                    assets.publish(os.path.join(source.root, name))
+                    report["published"] += 1
+        log(f"{deck['id']:12s} {len(deck['slides'])} slides warmed in {time.perf_counter() - t:.2f}s")
+
+    report["seconds"] = round(time.perf_counter() - t0, 3)
+    return report